@@ -0,0 +1,109 @@
+import numpy as np
+
+from functools import lru_cache
+from math import comb
+
+
+@lru_cache(maxsize=None)
+def bernstein_basis(degree, steps):
+    """Matriz (steps + 1, degree + 1) dos polinômios de Bernstein em t = i / steps.
+
+    A matriz é compartilhada (somente leitura) por todas as curvas com o mesmo grau
+    e o mesmo número de amostras: os pontos da curva são B @ P, onde P contém os
+    pontos de controle transformados.
+    """
+    basis = bernstein_matrix(degree, np.arange(steps + 1) / steps)
+    basis.setflags(write=False)
+    return basis
+
+def bernstein_matrix(degree, t):
+    """Matriz (len(t), degree + 1) dos polinômios de Bernstein nos parâmetros t."""
+    t = np.asarray(t, dtype=float)[:, None]
+    i = np.arange(degree + 1)
+    coefficients = np.array([comb(degree, k) for k in range(degree + 1)], dtype=float)
+    return coefficients * t ** i * (1 - t) ** (degree - i)
+
+def bspline_weights(knots, degree, u):
+    """Intervalos de knots e pesos das funções de base B-spline nos parâmetros u.
+
+    Retorna (spans, weights), com weights de forma (len(u), degree + 1), de modo que
+    o ponto da curva em u[s] é sum(weights[s, j] * P[spans[s] - degree + j]).
+    Os pesos vêm da mesma recorrência de De Boor, aplicada a vetores unitários
+    para todos os parâmetros de uma vez.
+    """
+    knots = np.asarray(knots, dtype=float)
+    u = np.asarray(u, dtype=float)
+    k = degree
+    n = len(knots) - k - 1  # Índice do último ponto de controle
+
+    # Encontra o intervalo de knots (knots[i] <= u < knots[i + 1]) por busca binária
+    spans = np.searchsorted(knots, u, side='right') - 1
+    spans = np.where((spans >= 0) & (spans < len(knots) - 1), spans, n)
+
+    # d[s, j] começa como o vetor unitário e_j e recebe as mesmas combinações do De Boor
+    d = np.broadcast_to(np.eye(k + 1), (len(u), k + 1, k + 1)).copy()
+    for r in range(1, k + 1):
+        for j in range(k, r - 1, -1):
+            left = knots.take(spans - k + j, mode='clip')
+            right = knots.take(spans + j - r + 1, mode='clip')
+            denom = right - left
+            with np.errstate(divide='ignore', invalid='ignore'):
+                alpha = np.where(denom == 0, 0.0, (u - left) / denom)[:, None]
+            d[:, j] = (1 - alpha) * d[:, j - 1] + alpha * d[:, j]
+    return spans, d[:, k]
+
+@lru_cache(maxsize=None)
+def uniform_knot_vector(degree, count):
+    """Vetor de knots uniforme (preso nas extremidades) para `count` pontos de controle."""
+    k = degree
+    knots = np.array([0] * k + list(range(1, count - k + 1)) + [count - k + 1] * k, dtype=float)
+    knots.setflags(write=False)
+    return knots
+
+@lru_cache(maxsize=None)
+def bspline_basis(degree, count, steps):
+    """Índices e pesos (em cache) da B-spline uniforme amostrada em steps + 1 parâmetros.
+
+    Retorna (indices, weights), ambos de forma (steps + 1, degree + 1): a amostra s
+    é sum(weights[s, j] * P[indices[s, j]]). Como cada amostra depende de apenas
+    degree + 1 pontos de controle, a avaliação por quadro é um produto em banda.
+    """
+    knots = uniform_knot_vector(degree, count)
+    u_min, u_max = knots[degree], knots[-degree - 1]
+    u = u_min + (u_max - u_min) * np.arange(steps + 1) / steps
+    spans, weights = bspline_weights(knots, degree, u)
+    indices = spans[:, None] - degree + np.arange(degree + 1)
+    indices.setflags(write=False)
+    weights.setflags(write=False)
+    return indices, weights
+
+def bspline_evaluate(indices, weights, control):
+    """Produto em banda: combina, para cada amostra, os degree + 1 pontos de controle."""
+    return np.einsum('sj,sjc->sc', weights, control[indices])
+
+# Matriz de base da B-spline cúbica uniforme (por trecho)
+BSPLINE_MATRIX = np.array([
+    [-1,  3, -3,  1],
+    [ 3, -6,  3,  0],
+    [-3,  0,  3,  0],
+    [ 1,  4,  1,  0]
+]) / 6
+
+@lru_cache(maxsize=None)
+def bspline_patch_basis(count, steps):
+    """Matriz (trechos * steps + 1, count) da B-spline cúbica uniforme por trechos.
+
+    Cada trecho entre pontos de controle consecutivos é amostrado com `steps`
+    divisões e as amostras nas emendas entre trechos aparecem uma única vez, de
+    modo que B @ P dá todas as amostras de uma direção da superfície.
+    """
+    patches = count - 3
+    samples = np.arange(patches * steps + 1)
+    patch = np.minimum(samples // steps, patches - 1)  # A última amostra fecha o último trecho
+    t = (samples - patch * steps) / steps
+    powers = np.stack((t ** 3, t ** 2, t, np.ones_like(t)), axis=1)
+    basis = np.zeros((len(samples), count))
+    rows = np.arange(len(samples))[:, None]
+    basis[rows, patch[:, None] + np.arange(4)] = powers @ BSPLINE_MATRIX
+    basis.setflags(write=False)
+    return basis
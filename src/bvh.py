@@ -0,0 +1,152 @@
+import numpy as np
+
+
+class BoundingVolumeHierarchy:
+    """Hierarquia de caixas envolventes (BVH) sobre as esferas envolventes dos objetos.
+
+    Cada nó guarda uma caixa alinhada aos eixos e o intervalo [start, start + count)
+    do array `order` com os objetos da sua subárvore. A consulta pelo volume de
+    visão desce a árvore um nível por vez, testando todos os nós do nível de uma só
+    vez: subárvores inteiramente fora são descartadas e subárvores inteiramente
+    dentro são aceitas sem testar os descendentes. O custo acompanha o que está
+    visível, não o tamanho da cena.
+
+    Objetos novos marcam a árvore para ser reconstruída na próxima consulta; um
+    objeto transformado só reajusta as caixas do caminho da sua folha até a raiz.
+    """
+    def __init__(self, leaf_size=8):
+        self.leaf_size = leaf_size  # Número máximo de objetos por folha
+        self.objects = []  # Objetos indexados
+        self.dirty = True  # A árvore precisa ser reconstruída
+        self.unbounded = []  # Objetos sem pontos (nunca descartados)
+
+    def insert(self, obj):
+        """Adiciona um objeto; a árvore é reconstruída na próxima consulta."""
+        self.objects.append(obj)
+        self.dirty = True
+
+    def object_box(self, obj):
+        """Caixa (mínimo, máximo) da esfera envolvente do objeto."""
+        center, radius = obj.bounding_sphere()
+        return center - radius, center + radius
+
+    def build(self):
+        """Constrói a árvore de cima para baixo, dividindo pela mediana do maior eixo."""
+        self.dirty = False
+        bounded = []
+        self.unbounded = []
+        for obj in self.objects:
+            center, radius = obj.bounding_sphere()
+            (self.unbounded if np.isinf(radius) else bounded).append(obj)
+        self.items = bounded
+        self.index_of = {id(obj): i for i, obj in enumerate(bounded)}
+        spheres = [obj.bounding_sphere() for obj in bounded]
+        self.centers = np.array([center for center, radius in spheres], dtype=float).reshape(-1, 3)
+        self.radii = np.array([radius for center, radius in spheres], dtype=float)
+        self.order = np.arange(len(bounded))
+        self.leaf_of = np.zeros(len(bounded), dtype=np.int64)  # Folha de cada objeto
+
+        low, high, start, count, left, right, parent = [], [], [], [], [], [], []
+
+        def build_node(begin, end, parent_node):
+            node = len(low)
+            indices = self.order[begin:end]
+            node_low = (self.centers[indices] - self.radii[indices, None]).min(axis=0)
+            node_high = (self.centers[indices] + self.radii[indices, None]).max(axis=0)
+            low.append(node_low)
+            high.append(node_high)
+            start.append(begin)
+            count.append(end - begin)
+            left.append(-1)
+            right.append(-1)
+            parent.append(parent_node)
+            if end - begin <= self.leaf_size:
+                self.leaf_of[indices] = node
+                return node
+            # Divide pela mediana dos centros ao longo do maior eixo da caixa
+            axis = int(np.argmax(node_high - node_low))
+            middle = (end - begin) // 2
+            partition = np.argpartition(self.centers[indices, axis], middle)
+            self.order[begin:end] = indices[partition]
+            left[node] = build_node(begin, begin + middle, node)
+            right[node] = build_node(begin + middle, end, node)
+            return node
+
+        if len(bounded):
+            build_node(0, len(bounded), -1)
+        self.low = np.array(low, dtype=float).reshape(-1, 3)
+        self.high = np.array(high, dtype=float).reshape(-1, 3)
+        self.start = np.array(start, dtype=np.int64)
+        self.count = np.array(count, dtype=np.int64)
+        self.left = np.array(left, dtype=np.int64)
+        self.right = np.array(right, dtype=np.int64)
+        self.parent = np.array(parent, dtype=np.int64)
+
+    def refit(self, obj):
+        """Atualiza as caixas depois que o objeto foi transformado (da folha até a raiz)."""
+        if self.dirty:
+            return  # A reconstrução pendente já vai usar os limites novos
+        i = self.index_of.get(id(obj))
+        center, radius = obj.bounding_sphere()
+        if i is None or np.isinf(radius):
+            # Objeto que entrou ou saiu do conjunto sem limites: reconstrói a árvore
+            self.dirty = True
+            return
+        self.centers[i] = center
+        self.radii[i] = radius
+        node = self.leaf_of[i]
+        while node >= 0:
+            if self.left[node] < 0:
+                indices = self.order[self.start[node]:self.start[node] + self.count[node]]
+                self.low[node] = (self.centers[indices] - self.radii[indices, None]).min(axis=0)
+                self.high[node] = (self.centers[indices] + self.radii[indices, None]).max(axis=0)
+            else:
+                children = [self.left[node], self.right[node]]
+                self.low[node] = self.low[children].min(axis=0)
+                self.high[node] = self.high[children].max(axis=0)
+            node = self.parent[node]
+
+    def query(self, planes):
+        """Objetos cuja esfera envolvente intercepta o volume dado pelos planos (P, 4).
+
+        Os planos devem estar normalizados e um ponto está dentro quando
+        a·x + b·y + c·z + d >= 0 para todos eles.
+        """
+        if self.dirty:
+            self.build()
+        if not len(self.items):
+            return list(self.unbounded)
+        normals, offsets = planes[:, :3], planes[:, 3]
+
+        accepted = []  # Intervalos de `order` aceitos sem testes adicionais
+        candidates = []  # Intervalos de folhas que cruzam o volume
+        frontier = np.zeros(1, dtype=np.int64)
+        while len(frontier):
+            # Caixa de cada nó como centro e meia-extensão
+            center = (self.low[frontier] + self.high[frontier]) / 2
+            extent = (self.high[frontier] - self.low[frontier]) / 2
+            distance = center @ normals.T + offsets
+            reach = extent @ np.abs(normals).T
+            outside = (distance < -reach).any(axis=1)
+            inside = (distance >= reach).all(axis=1)
+            crossing = ~outside & ~inside
+            leaf = self.left[frontier] < 0
+            accepted.append(frontier[inside])
+            candidates.append(frontier[crossing & leaf])
+            split = frontier[crossing & ~leaf]
+            frontier = np.concatenate((self.left[split], self.right[split]))
+
+        accepted = self.ranges(np.concatenate(accepted))
+        candidates = self.ranges(np.concatenate(candidates))
+        # Objetos das folhas que cruzam o volume: testa cada esfera
+        distance = self.centers[candidates] @ normals.T + offsets
+        candidates = candidates[(distance >= -self.radii[candidates, None]).all(axis=1)]
+        indices = np.sort(np.concatenate((accepted, candidates)))
+        return [self.items[i] for i in indices.tolist()] + self.unbounded
+
+    def ranges(self, nodes):
+        """Índices dos objetos de todos os nós dados (concatenação dos seus intervalos)."""
+        starts, counts = self.start[nodes], self.count[nodes]
+        total = int(counts.sum())
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return self.order[offsets + np.arange(total)]
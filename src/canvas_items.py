@@ -0,0 +1,69 @@
+class CanvasItems:
+    """Itens do canvas de um objeto, reaproveitados entre quadros (modo retido).
+
+    Em vez de apagar e recriar os itens a cada quadro, o objeto reutiliza os itens
+    já existentes, atualizando as coordenadas com canvas.coords e as opções com
+    canvas.itemconfig. Itens só são criados quando o número de primitivas
+    desenhadas aumenta e são escondidos quando diminui.
+    """
+    def __init__(self, tag):
+        self.tag = tag      # Tag comum a todos os itens (usada para ordenar a pilha)
+        self.ids = []       # Identificadores dos itens no canvas
+        self.kinds = []     # Tipo de cada item ('line', 'polygon', 'oval')
+        self.options = []   # Últimas opções aplicadas a cada item
+        self.hidden = []    # Indica se o item está escondido
+        self.used = 0       # Itens usados no quadro atual
+        self.created = False  # Indica se algum item foi criado no quadro atual
+
+    def begin(self):
+        """Inicia um novo quadro: todos os itens ficam disponíveis para reuso."""
+        self.used = 0
+        self.created = False
+
+    def end(self, canvas):
+        """Esconde os itens que não foram usados no quadro atual."""
+        for i in range(self.used, len(self.ids)):
+            if not self.hidden[i]:
+                canvas.itemconfig(self.ids[i], state='hidden')
+                self.hidden[i] = True
+
+    def hide(self, canvas):
+        """Esconde todos os itens (objeto fora da tela neste quadro)."""
+        self.begin()
+        self.end(canvas)
+
+    def draw(self, canvas, kind, coords, **options):
+        """Desenha uma primitiva reaproveitando o próximo item disponível."""
+        i = self.used
+        self.used += 1
+        if i < len(self.ids) and self.kinds[i] == kind:
+            item = self.ids[i]
+            canvas.coords(item, *coords)
+            if self.hidden[i] or self.options[i] != options:
+                canvas.itemconfig(item, state='normal', **options)
+                self.options[i] = options
+                self.hidden[i] = False
+            return item
+
+        create = getattr(canvas, 'create_' + kind)
+        item = create(*coords, tags=self.tag, **options)
+        self.created = True
+        if i < len(self.ids):
+            # O tipo da primitiva mudou: substitui o item antigo
+            canvas.delete(self.ids[i])
+            self.ids[i], self.kinds[i], self.options[i], self.hidden[i] = item, kind, options, False
+        else:
+            self.ids.append(item)
+            self.kinds.append(kind)
+            self.options.append(options)
+            self.hidden.append(False)
+        return item
+
+    def line(self, canvas, coords, **options):
+        return self.draw(canvas, 'line', coords, **options)
+
+    def polygon(self, canvas, coords, **options):
+        return self.draw(canvas, 'polygon', coords, **options)
+
+    def oval(self, canvas, coords, **options):
+        return self.draw(canvas, 'oval', coords, **options)
@@ -1,3 +1,5 @@
+import numpy as np
+
 INSIDE = 0  # 0000
 LEFT = 1    # 0001
 RIGHT = 2   # 0010
@@ -61,6 +63,40 @@ def cohen_sutherland_clip(x0, y0, x1, y1, clip_region):
     else:
         return None
 
+def liang_barsky_clip_batch(x0, y0, x1, y1, clip_region):
+    """Recorta vários segmentos de uma só vez com o algoritmo de Liang-Barsky.
+
+    Recebe arrays com as extremidades dos segmentos e retorna um array (M, 4) com
+    os segmentos aceitos, já recortados, e um array com os índices dos segmentos
+    de origem.
+    """
+    x_min, y_min, x_max, y_max = clip_region
+    x0 = np.asarray(x0, dtype=float)
+    y0 = np.asarray(y0, dtype=float)
+    x1 = np.asarray(x1, dtype=float)
+    y1 = np.asarray(y1, dtype=float)
+    dx = x1 - x0
+    dy = y1 - y0
+
+    # Forma paramétrica: o segmento está dentro da borda k quando t * p[k] <= q[k]
+    p = np.stack((-dx, dx, -dy, dy))
+    q = np.stack((x0 - x_min, x_max - x0, y0 - y_min, y_max - y0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = q / p
+
+    # Segmentos paralelos a uma borda e fora dela são rejeitados
+    rejected = ((p == 0) & (q < 0)).any(axis=0)
+    # Bordas de entrada (p < 0) aumentam t0, bordas de saída (p > 0) diminuem t1
+    t0 = np.where(p < 0, r, 0.0).max(axis=0)
+    t1 = np.where(p > 0, r, 1.0).min(axis=0)
+
+    accepted = np.flatnonzero(~rejected & (t0 <= t1))
+    t0 = t0[accepted]
+    t1 = t1[accepted]
+    x0, y0, dx, dy = x0[accepted], y0[accepted], dx[accepted], dy[accepted]
+    segments = np.column_stack((x0 + t0 * dx, y0 + t0 * dy, x0 + t1 * dx, y0 + t1 * dy))
+    return segments, accepted
+
 def sutherland_hodgman_clip(polygon, clip_region):
     """Implementação do algoritmo de clipping de polígono de Sutherland-Hodgman."""
     x_min, y_min, x_max, y_max = clip_region
@@ -114,4 +150,146 @@ def sutherland_hodgman_clip(polygon, clip_region):
                 output_list.append(compute_intersection(s, e, edge))
             s = e
 
-    return output_list
\ No newline at end of file
+    return output_list
+
+
+def sutherland_hodgman_clip_batch(polygons, clip_region, sizes=None):
+    """Recorta vários polígonos de uma só vez com o algoritmo de Sutherland-Hodgman.
+
+    polygons: array (P, K, 2) com os vértices de cada polígono
+    sizes: número de vértices válidos de cada polígono (os demais são ignorados);
+           por padrão todos os K vértices são usados
+
+    Retorna uma lista com as coordenadas planas (x0, y0, x1, y1, ...) dos polígonos
+    que restaram após o recorte, prontas para o canvas, e um array com os índices
+    dos polígonos de origem.
+    """
+    x_min, y_min, x_max, y_max = clip_region
+    polygons = np.asarray(polygons, dtype=float).reshape(len(polygons), -1, 2)
+    count, width = polygons.shape[:2]
+    if sizes is None:
+        sizes = np.full(count, width)
+    sizes = np.asarray(sizes)
+    valid = np.arange(width) < sizes[:, None]
+
+    # Caixa envolvente de cada polígono na tela
+    x = polygons[..., 0]
+    y = polygons[..., 1]
+    box_x_min = np.where(valid, x, np.inf).min(axis=1)
+    box_x_max = np.where(valid, x, -np.inf).max(axis=1)
+    box_y_min = np.where(valid, y, np.inf).min(axis=1)
+    box_y_max = np.where(valid, y, -np.inf).max(axis=1)
+
+    # Aceitação trivial: caixa inteiramente dentro da região
+    inside = (box_x_min >= x_min) & (box_x_max <= x_max) & (box_y_min >= y_min) & (box_y_max <= y_max)
+    # Rejeição trivial: caixa inteiramente fora de uma das bordas
+    outside = (box_x_max < x_min) | (box_x_min > x_max) | (box_y_max < y_min) | (box_y_min > y_max)
+    outside |= sizes == 0
+
+    results = {}
+    for i in np.flatnonzero(inside).tolist():
+        results[i] = polygons[i, :sizes[i]].ravel().tolist()
+
+    pending = np.flatnonzero(~inside & ~outside)
+    if len(pending):
+        points, counts = clip_polygons_against_edges(polygons[pending], sizes[pending], clip_region)
+        for i, points_i, count_i in zip(pending.tolist(), points, counts.tolist()):
+            if count_i:
+                results[i] = points_i[:count_i].ravel().tolist()
+
+    indices = np.array(sorted(results), dtype=np.int64)
+    return [results[i] for i in indices.tolist()], indices
+
+def clip_polygons_against_edges(points, counts, clip_region):
+    """Aplica as quatro etapas de Sutherland-Hodgman a um lote de polígonos.
+
+    points: array (P, K, 2) de vértices; counts: vértices válidos de cada polígono.
+    Retorna os vértices recortados, compactados no início de cada linha, e as
+    novas contagens.
+    """
+    x_min, y_min, x_max, y_max = clip_region
+    clip_edges = [
+        (0, x_min, True),   # left: x >= x_min
+        (0, x_max, False),  # right: x <= x_max
+        (1, y_max, False),  # bottom: y <= y_max
+        (1, y_min, True),   # top: y >= y_min (invertido devido ao sistema de coordenadas)
+    ]
+    for axis, value, keep_greater in clip_edges:
+        points, counts = clip_polygons_against_plane(points, counts, axis, value, keep_greater)
+    return points, counts
+
+def clip_polygons_against_plane(points, counts, axis, value, keep_greater):
+    """Uma etapa de Sutherland-Hodgman em lote: recorta pelo plano coordenada[axis] = value.
+
+    points: array (P, K, D) de vértices (D = 2 ou 3); counts: vértices válidos de
+    cada polígono. Mantém a parte com coordenada >= value (keep_greater) ou <= value.
+    Retorna os vértices recortados, compactados no início de cada linha, e as
+    novas contagens (0 para polígonos inteiramente do lado descartado).
+    """
+    points = np.asarray(points, dtype=float)
+    counts = np.asarray(counts)
+    width = points.shape[1]
+    if width == 0:
+        return points, counts
+    index = np.arange(width)
+    valid = index < counts[:, None]
+    # Vértice anterior de cada vértice (o primeiro liga-se ao último válido)
+    previous_index = np.where(index == 0, np.maximum(counts[:, None] - 1, 0), index - 1)
+    current = points
+    previous = np.take_along_axis(points, previous_index[..., None], axis=1)
+
+    if keep_greater:
+        current_inside = current[..., axis] >= value
+        previous_inside = previous[..., axis] >= value
+    else:
+        current_inside = current[..., axis] <= value
+        previous_inside = previous[..., axis] <= value
+
+    # Interseção da aresta (anterior -> atual) com o plano
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = ((value - previous[..., axis]) / (current[..., axis] - previous[..., axis]))[..., None]
+        intersection = previous + (current - previous) * t
+    intersection[..., axis] = value
+
+    # Cada vértice gera até dois pontos de saída: a interseção e o próprio vértice
+    candidates = np.stack((intersection, current), axis=2).reshape(len(points), 2 * width, points.shape[2])
+    emitted = np.stack((valid & (current_inside != previous_inside), valid & current_inside), axis=2).reshape(len(points), 2 * width)
+
+    # Compacta os pontos emitidos no início de cada linha, preservando a ordem
+    order = np.argsort(~emitted, axis=1, kind='stable')
+    counts = emitted.sum(axis=1)
+    width = counts.max(initial=0)
+    points = np.take_along_axis(candidates, order[:, :width, None], axis=1)
+    return points, counts
+
+def clip_segments_near(starts, ends, near):
+    """Recorta segmentos 3D (espaço da câmera) pelo plano próximo z = -near.
+
+    starts, ends: arrays (N, 3). Mantém a parte de cada segmento com z <= -near.
+    Retorna os novos extremos e os índices dos segmentos que restaram.
+    """
+    starts = np.asarray(starts, dtype=float).reshape(-1, 3)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 3)
+    start_inside = starts[:, 2] <= -near
+    end_inside = ends[:, 2] <= -near
+    indices = np.flatnonzero(start_inside | end_inside)
+    starts, ends = starts[indices], ends[indices]
+    start_inside, end_inside = start_inside[indices], end_inside[indices]
+
+    # Ponto em que o segmento cruza o plano próximo
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = ((-near - starts[:, 2]) / (ends[:, 2] - starts[:, 2]))[:, None]
+        crossing = starts + (ends - starts) * t
+    starts = np.where(start_inside[:, None], starts, crossing)
+    ends = np.where(end_inside[:, None], ends, crossing)
+    return starts, ends, indices
+
+def clip_polygons_near(points, counts, near):
+    """Recorta um lote de polígonos 3D (espaço da câmera) pelo plano próximo z = -near.
+
+    points: array (P, K, 3) de vértices; counts: vértices válidos de cada polígono.
+    Mantém a parte com z <= -near e retorna os vértices recortados, compactados no
+    início de cada linha, e as novas contagens (0 para polígonos inteiramente
+    atrás do plano).
+    """
+    return clip_polygons_against_plane(points, counts, 2, -near, False)
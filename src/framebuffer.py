@@ -0,0 +1,224 @@
+import numpy as np
+import struct
+import zlib
+
+
+# Cores nomeadas usadas pela aplicação (mesmos valores RGB do Tk)
+COLORS = {
+    'white': (255, 255, 255),
+    'black': (0, 0, 0),
+    'red': (255, 0, 0),
+    'green': (0, 255, 0),
+    'blue': (0, 0, 255),
+    'cyan': (0, 255, 255),
+    'magenta': (255, 0, 255),
+    'yellow': (255, 255, 0),
+    'orange': (255, 165, 0),
+    'brown': (165, 42, 42),
+    'pink': (255, 192, 203),
+    'purple': (160, 32, 240),
+    'gray': (190, 190, 190),
+    'grey': (190, 190, 190),
+    'lightgray': (211, 211, 211),
+    'lightgrey': (211, 211, 211),
+}
+
+def parse_color(color):
+    """Converte um nome de cor ou '#rgb'/'#rrggbb' em uma tupla RGB (None = transparente)."""
+    if not color:
+        return None
+    if color.startswith('#'):
+        digits = color[1:]
+        size = len(digits) // 3
+        return tuple(int(digits[i * size:(i + 1) * size], 16) * 255 // (16 ** size - 1) for i in range(3))
+    return COLORS[color.lower().replace(' ', '')]
+
+
+class Framebuffer:
+    """Canvas em software que rasteriza a cena em um framebuffer RGB do NumPy.
+
+    Implementa a parte da interface do tk.Canvas usada pelos objetos e pela janela
+    (create_*, coords, itemconfig, delete, tag_raise), de modo que o mesmo
+    draw(canvas, clip_region) funciona sem um display. Os itens são guardados em
+    modo retido e só são rasterizados em render(), na ordem da pilha.
+    """
+    def __init__(self, width=800, height=600, background='white'):
+        self.width = width
+        self.height = height
+        self.background = background
+        self.items = {}  # Identificador -> [tipo, coordenadas, opções]
+        self.order = []  # Pilha de desenho (do fundo para o topo)
+        self.next_id = 1
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)
+
+    def create(self, kind, coords, options):
+        if len(coords) == 1:
+            coords = coords[0]  # Coordenadas passadas como uma única sequência
+        item = self.next_id
+        self.next_id += 1
+        tags = options.get('tags', ())
+        options['tags'] = (tags,) if isinstance(tags, str) else tuple(tags)
+        self.items[item] = [kind, [float(c) for c in coords], options]
+        self.order.append(item)
+        return item
+
+    def create_line(self, *coords, **options):
+        return self.create('line', coords, options)
+
+    def create_polygon(self, *coords, **options):
+        return self.create('polygon', coords, options)
+
+    def create_oval(self, *coords, **options):
+        return self.create('oval', coords, options)
+
+    def create_rectangle(self, *coords, **options):
+        return self.create('rectangle', coords, options)
+
+    def find(self, tag_or_id):
+        """Itens com o identificador ou a tag dados, na ordem da pilha."""
+        if tag_or_id == 'all':
+            return list(self.order)
+        if tag_or_id in self.items:
+            return [tag_or_id]
+        return [item for item in self.order if tag_or_id in self.items[item][2]['tags']]
+
+    def coords(self, item, *coords):
+        if not coords:
+            return list(self.items[item][1])
+        if len(coords) == 1:
+            coords = coords[0]
+        self.items[item][1] = [float(c) for c in coords]
+
+    def itemconfig(self, item, **options):
+        for i in self.find(item):
+            self.items[i][2].update(options)
+
+    itemconfigure = itemconfig
+
+    def delete(self, tag_or_id):
+        for item in self.find(tag_or_id):
+            del self.items[item]
+            self.order.remove(item)
+
+    def tag_raise(self, tag_or_id):
+        """Move os itens para o topo da pilha, mantendo a ordem entre eles."""
+        raised = self.find(tag_or_id)
+        if raised:
+            raised_set = set(raised)
+            self.order = [item for item in self.order if item not in raised_set] + raised
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def render(self):
+        """Rasteriza todos os itens visíveis e retorna o array (altura, largura, 3)."""
+        self.pixels[:] = parse_color(self.background) or (0, 0, 0)
+        for item in self.order:
+            kind, coords, options = self.items[item]
+            if options.get('state') == 'hidden':
+                continue
+            if kind == 'line':
+                self.draw_polyline(coords, options.get('fill', 'black'))
+            elif kind == 'polygon':
+                self.fill_polygon(coords, options.get('fill', 'black'))
+                self.draw_polyline(coords + coords[:2], options.get('outline', ''))
+            elif kind == 'rectangle':
+                x0, y0, x1, y1 = coords
+                corners = [x0, y0, x1, y0, x1, y1, x0, y1]
+                self.fill_polygon(corners, options.get('fill', ''))
+                self.draw_polyline(corners + corners[:2], options.get('outline', 'black'))
+            elif kind == 'oval':
+                self.draw_oval(coords, options.get('fill', ''), options.get('outline', 'black'))
+        return self.pixels
+
+    def draw_polyline(self, coords, color):
+        """Rasteriza os segmentos de uma polilinha amostrando cada um a cada pixel (DDA)."""
+        rgb = parse_color(color)
+        if rgb is None or len(coords) < 4:
+            return
+        points = np.asarray(coords, dtype=float).reshape(-1, 2)
+        start, end = points[:-1], points[1:]
+        lengths = np.ceil(np.abs(end - start).max(axis=1)).astype(int) + 1
+        # Parâmetro t de cada amostra, para todos os segmentos de uma vez
+        segment = np.repeat(np.arange(len(start)), lengths)
+        offsets = np.arange(len(segment)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        t = (offsets / np.maximum(lengths - 1, 1)[segment])[:, None]
+        samples = np.floor(start[segment] + t * (end[segment] - start[segment])).astype(int)
+        self.plot(samples[:, 0], samples[:, 1], rgb)
+
+    def fill_polygon(self, coords, color):
+        """Preenche um polígono pela regra par-ímpar, com os centros dos pixels como amostras."""
+        rgb = parse_color(color)
+        if rgb is None or len(coords) < 6:
+            return
+        points = np.asarray(coords, dtype=float).reshape(-1, 2)
+        row_min = max(int(np.floor(points[:, 1].min())), 0)
+        row_max = min(int(np.ceil(points[:, 1].max())), self.height)
+        column_min = max(int(np.floor(points[:, 0].min())), 0)
+        column_max = min(int(np.ceil(points[:, 0].max())), self.width)
+        if row_min >= row_max or column_min >= column_max:
+            return
+
+        # Interseções de cada linha de varredura com cada aresta
+        x0, y0 = points[:, 0], points[:, 1]
+        x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+        yc = np.arange(row_min, row_max)[:, None] + 0.5
+        crosses = (y0 <= yc) != (y1 <= yc)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = x0 + (yc - y0) * (x1 - x0) / (y1 - y0)
+        rows, edges = np.nonzero(crosses)
+        columns = np.clip(np.ceil(x[rows, edges] - 0.5).astype(int) - column_min, 0, column_max - column_min)
+
+        # Cada interseção inverte o estado dentro/fora dos pixels à sua direita
+        toggles = np.zeros((row_max - row_min, column_max - column_min + 1), dtype=np.int32)
+        np.add.at(toggles, (rows, columns), 1)
+        inside = (np.cumsum(toggles, axis=1)[:, :-1] % 2).astype(bool)
+        self.pixels[row_min:row_max, column_min:column_max][inside] = rgb
+
+    def draw_oval(self, coords, fill, outline):
+        """Desenha uma elipse inscrita na caixa (x0, y0, x1, y1)."""
+        x0, y0, x1, y1 = coords
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        rx, ry = abs(x1 - x0) / 2, abs(y1 - y0) / 2
+        angles = np.linspace(0, 2 * np.pi, 33)
+        contour = np.column_stack((cx + rx * np.cos(angles), cy + ry * np.sin(angles)))
+        self.fill_polygon(contour.ravel(), fill)
+        self.draw_polyline(contour.ravel(), outline)
+
+    def plot(self, x, y, rgb):
+        """Pinta os pixels (x, y) que estão dentro do framebuffer."""
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        self.pixels[y[inside], x[inside]] = rgb
+
+    def save(self, path):
+        """Rasteriza a cena e grava em PNG (extensão .png) ou PPM."""
+        self.render()
+        if str(path).lower().endswith('.png'):
+            self.write_png(path)
+        else:
+            self.write_ppm(path)
+
+    def write_ppm(self, path):
+        """Grava o framebuffer no formato PPM binário (P6)."""
+        with open(path, 'wb') as image_file:
+            image_file.write(b'P6\n%d %d\n255\n' % (self.width, self.height))
+            image_file.write(self.pixels.tobytes())
+
+    def write_png(self, path):
+        """Grava o framebuffer em PNG (RGB de 8 bits, sem dependências externas)."""
+        def chunk(kind, data):
+            body = kind + data
+            return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xffffffff)
+
+        # Cada linha da imagem começa com o tipo de filtro (0 = nenhum)
+        rows = np.zeros((self.height, self.width * 3 + 1), dtype=np.uint8)
+        rows[:, 1:] = self.pixels.reshape(self.height, -1)
+        header = struct.pack('>IIBBBBB', self.width, self.height, 8, 2, 0, 0, 0)
+        with open(path, 'wb') as image_file:
+            image_file.write(b'\x89PNG\r\n\x1a\n')
+            image_file.write(chunk(b'IHDR', header))
+            image_file.write(chunk(b'IDAT', zlib.compress(rows.tobytes())))
+            image_file.write(chunk(b'IEND', b''))
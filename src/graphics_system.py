@@ -1,46 +1,58 @@
 import tkinter as tk
+import numpy as np
 import math
+import os
+import time
 
 from tkinter import filedialog, messagebox
 
 from object3d import *
+from framebuffer import *
+from bvh import *
+from obj_loader import *
 from transformation import *
 
 
 class Window:
-    def __init__(self, width=800, height=600, title="Sistema Gráfico 3D"):
+    def __init__(self, width=800, height=600, title="Sistema Gráfico 3D", headless=False):
         self.width = width
         self.height = height
         self.title = title
 
-        # Configurações da janela
-        self.root = tk.Tk()
-        self.root.title(self.title)
+        # Sem display (headless), a cena é desenhada em um framebuffer NumPy
+        self.headless = headless
+        if headless:
+            self.root = None
+            self.canvas = Framebuffer(self.width, self.height)
+        else:
+            # Configurações da janela
+            self.root = tk.Tk()
+            self.root.title(self.title)
 
-        # Criação do menu
-        self.create_menu()
+            # Criação do menu
+            self.create_menu()
 
-        # Frame principal para conter o canvas e os botões
-        main_frame = tk.Frame(self.root)
-        main_frame.grid(row=0, column=0, sticky='nsew')
+            # Frame principal para conter o canvas e os botões
+            main_frame = tk.Frame(self.root)
+            main_frame.grid(row=0, column=0, sticky='nsew')
 
-        # Configurações para redimensionamento
-        self.root.rowconfigure(0, weight=1)
-        self.root.columnconfigure(0, weight=1)
-        main_frame.rowconfigure(0, weight=1)
-        main_frame.columnconfigure(0, weight=1)
-        main_frame.columnconfigure(1, weight=0)
+            # Configurações para redimensionamento
+            self.root.rowconfigure(0, weight=1)
+            self.root.columnconfigure(0, weight=1)
+            main_frame.rowconfigure(0, weight=1)
+            main_frame.columnconfigure(0, weight=1)
+            main_frame.columnconfigure(1, weight=0)
 
-        # Canvas
-        self.canvas = tk.Canvas(main_frame, bg='white', width=self.width, height=self.height)
-        self.canvas.grid(row=0, column=0, sticky='nsew')
+            # Canvas
+            self.canvas = tk.Canvas(main_frame, bg='white', width=self.width, height=self.height)
+            self.canvas.grid(row=0, column=0, sticky='nsew')
 
-        # Vincula o evento de redimensionamento do canvas
-        self.canvas.bind('<Configure>', self.on_canvas_resize)
+            # Vincula o evento de redimensionamento do canvas
+            self.canvas.bind('<Configure>', self.on_canvas_resize)
 
-        # Painel lateral para os botões e a lista de objetos
-        side_frame = tk.Frame(main_frame)
-        side_frame.grid(row=0, column=1, sticky='ns')
+            # Painel lateral para os botões e a lista de objetos
+            side_frame = tk.Frame(main_frame)
+            side_frame.grid(row=0, column=1, sticky='ns')
 
         # Definindo a margem
         self.margin = 50  # Pixels
@@ -56,6 +68,10 @@ class Window:
         self.center_x = self.width // 2
         self.center_y = self.height // 2
 
+        # Malhas importadas com pelo menos este número de vértices ficam em arquivos
+        # np.memmap no cache do OBJ, em vez do buffer da cena
+        self.memmap_vertices = 1_000_000
+
         # Parâmetros de projeção
         self.scale = 500  # Controle de zoom
         self.projection_type = 'perspective'  # Tipo de projeção inicial
@@ -71,15 +87,35 @@ class Window:
         # Lista de objetos 3D
         self.objects = []
 
+        # Buffer único com os vértices de todos os objetos da cena
+        self.vertex_buffer = VertexBuffer()
+        # Índice espacial sobre os limites dos objetos, para o descarte pelo volume de visão
+        self.spatial_index = BoundingVolumeHierarchy()
+
         # Objeto selecionado
         self.selected_object = None
 
         # Lista de transformações pendentes
         self.transformations = []
 
+        # Renderização sob demanda: um quadro só é produzido quando a cena muda.
+        # Com continuous_rendering = True a cena é redesenhada a cada 16 ms.
+        self.continuous_rendering = False
+        self.dirty = True  # Indica se o quadro atual está desatualizado
+        self.pending_update = None  # Identificador do callback agendado no Tk
+
+        # Modo retido: os itens do canvas são reaproveitados entre quadros
+        self.clip_rectangle = None  # Item da margem da região de clipping
+        self.drawn_objects = []  # Objetos desenhados no último quadro, em ordem
+        self.draw_order = []  # Todos os objetos, do mais distante ao mais próximo (último quadro)
+
         # Inicializa os objetos 3D
         self.create_objects()
 
+        if headless:
+            # Sem Tk não há painel lateral nem eventos: os quadros são desenhados com update()
+            return
+
         # Criação de Subframes dentro do side_frame
         # 1. Frame para os Botões de Navegação
         navigation_frame = tk.Frame(side_frame)
@@ -104,8 +140,8 @@ class Window:
 
         self.bind_events()
 
-        # Inicia o loop de atualização
-        self.update()
+        # Agenda o primeiro quadro
+        self.invalidate()
 
     def create_menu(self):
         """Cria o menu da aplicação."""
@@ -137,6 +173,8 @@ class Window:
 
     def on_canvas_resize(self, event):
         """Atualiza os parâmetros quando o canvas é redimensionado."""
+        if (event.width, event.height) == (self.width, self.height):
+            return  # Nada mudou, não é preciso redesenhar
         self.width = event.width
         self.height = event.height
 
@@ -151,6 +189,7 @@ class Window:
             self.width - self.margin,
             self.height - self.margin
         )
+        self.invalidate()
 
     def create_navigation_buttons(self, parent):
         # Cria botões para rotacionar a câmera
@@ -364,7 +403,7 @@ class Window:
         ]
         bezier_surface = BezierSurface3D(control_points_matrix, color='cyan', wireframe=True, name="Superficie de Bezier")
         rotate_object(bezier_surface, 30, 'x')
-        self.objects.append(bezier_surface)
+        self.add_object(bezier_surface)
 
         # B-spline Bicubic Surface
         control_points_matrix_bspline = [
@@ -375,7 +414,7 @@ class Window:
         ]
         bspline_surface = BSplineSurface3D(control_points_matrix_bspline, color='yellow', wireframe=True, name="Superfície B-spline")
         rotate_object(bspline_surface, 30, 'x')
-        self.objects.append(bspline_surface)
+        self.add_object(bspline_surface)
 
 
         # Cubo no Octante 1 (x > 0, y > 0, z > 0)
@@ -383,17 +422,17 @@ class Window:
         rotate_object(cube, 45, 'x')
         rotate_object(cube, 30, 'y')
         translate_object(cube, 0, 0, -1)
-        self.objects.append(cube)
+        self.add_object(cube)
 
         # Ponto no Octante 2 (x < 0, y > 0, z > 0)
         point = Point3D(-2, 2, 2, color='green', name="Ponto")
         translate_object(point, 1, 0, 0)
-        self.objects.append(point)
+        self.add_object(point)
 
         # Reta no Octante 3 (x < 0, y < 0, z > 0)
         line = Line3D(Point3D(-2, -2, 2), Point3D(-1, -1, 2), color='red', name="Linha")
         rotate_object(line, 45, 'z')
-        self.objects.append(line)
+        self.add_object(line)
 
         # Polígono no Octante 4 (x > 0, y < 0, z > 0) sem preenchimento
         vertices = [
@@ -404,7 +443,7 @@ class Window:
         ]
         polygon = Polygon3D(vertices, color='purple', name="Poligono")  # fill_color não especificado
         scale_object(polygon, 1, 2, 1)
-        self.objects.append(polygon)
+        self.add_object(polygon)
 
         # Curva de Bézier no Octante 5 (x > 0, y > 0, z < 0)
         bezier_control_points = [
@@ -418,7 +457,7 @@ class Window:
         ]
         bezier_curve = BezierCurve3D(bezier_control_points, color='orange', name="Curva de Bezier")
         translate_object(bezier_curve, -2, 0, 0)
-        self.objects.append(bezier_curve)
+        self.add_object(bezier_curve)
 
         # Curva B-spline no Octante 6 (x < 0, y > 0, z < 0)
         bspline_control_points = [
@@ -434,7 +473,7 @@ class Window:
         ]
         bspline_curve = BSplineCurve3D(bspline_control_points, degree=3, color='brown', name="BSpline")
         scale_object(bspline_curve, 0.5, 0.5, 0.5)
-        self.objects.append(bspline_curve)
+        self.add_object(bspline_curve)
 
         # Cone no Octante 7 (x < 0, y < 0, z < 0)
         cone = Cone3D(
@@ -447,7 +486,14 @@ class Window:
             name="Cone"
         )
         rotate_object(cone, 30, 'y')
-        self.objects.append(cone)
+        self.add_object(cone)
+
+    def add_object(self, obj):
+        """Adiciona um objeto à cena, movendo seus vértices para o buffer da cena."""
+        obj.attach(self.vertex_buffer)
+        self.objects.append(obj)
+        self.spatial_index.insert(obj)
+        self.invalidate()
 
     def on_object_select(self, event):
         """Chamado quando um objeto é selecionado na lista."""
@@ -509,18 +555,13 @@ class Window:
     def apply_transformations(self):
         """Aplica todas as transformações pendentes ao objeto selecionado."""
         if self.selected_object:
-            for transformation in self.transformations:
-                if transformation.type == 'translate':
-                    dx, dy, dz = transformation.params
-                    translate_object(self.selected_object, dx, dy, dz)
-                elif transformation.type == 'rotate':
-                    angle, axis = transformation.params
-                    rotate_object(self.selected_object, angle, axis)
-                elif transformation.type == 'scale':
-                    sx, sy, sz = transformation.params
-                    scale_object(self.selected_object, sx, sy, sz)
+            # Compõe a fila em uma única matriz e a aplica a todos os vértices de uma vez
+            apply_matrix(self.selected_object, compose_transformations(self.transformations))
+            # Reajusta as caixas da BVH com os novos limites do objeto
+            self.spatial_index.refit(self.selected_object)
             # Limpa a lista de transformações após aplicar
             self.clear_transformations()
+            self.invalidate()
         else:
             messagebox.showwarning("Nenhum objeto selecionado", "Por favor, selecione um objeto na lista para aplicar as transformações.")
 
@@ -559,7 +600,7 @@ class Window:
             # Cria a superfície bicúbica
             bicubic_surface = BezierSurface3D(control_points_matrix, color='orange', wireframe=True, name="Superfície Bicúbica")
             rotate_object(bicubic_surface, 30, 'x')  # Aplicar rotações padrão ou personalizadas
-            self.objects.append(bicubic_surface)
+            self.add_object(bicubic_surface)
 
             # Limpa a entrada após adicionar
             self.surface_entry.delete(0, tk.END)
@@ -603,7 +644,7 @@ class Window:
             # Create the B-spline surface
             bspline_surface = BSplineSurface3D(control_points_matrix, color='yellow', wireframe=True, name="Superfície B-spline")
             rotate_object(bspline_surface, 30, 'x')
-            self.objects.append(bspline_surface)
+            self.add_object(bspline_surface)
             self.object_listbox.insert(tk.END, bspline_surface.name)
             self.bspline_surface_entry.delete(0, tk.END)
 
@@ -616,7 +657,7 @@ class Window:
         try:
             x, y, z = map(float, coords.split(','))
             point = Point3D(x, y, z, color='green', name="Ponto")
-            self.objects.append(point)
+            self.add_object(point)
             self.point_entry.delete(0, tk.END)
         except ValueError:
             tk.messagebox.showerror("Erro ao Adicionar Ponto", "Entrada inválida para as coordenadas do ponto.\nFormato esperado: x,y,z")
@@ -633,7 +674,7 @@ class Window:
             start = Point3D(x1, y1, z1)
             end = Point3D(x2, y2, z2)
             line = Line3D(start, end, color='red', name="Linha")
-            self.objects.append(line)
+            self.add_object(line)
             self.line_entry.delete(0, tk.END)
         except ValueError as e:
             tk.messagebox.showerror("Erro ao Adicionar Linha", f"Erro: {e}")
@@ -650,7 +691,7 @@ class Window:
                 x, y, z = map(float, point_str.split(','))
                 vertices.append(Point3D(x, y, z))
             polygon = Polygon3D(vertices, color='purple', name="Polígono")
-            self.objects.append(polygon)
+            self.add_object(polygon)
             self.polygon_entry.delete(0, tk.END)
         except ValueError as e:
             tk.messagebox.showerror("Erro ao Adicionar Polígono", f"Erro: {e}")
@@ -667,7 +708,7 @@ class Window:
                 x, y, z = map(float, point_str.split(','))
                 control_points.append(Point3D(x, y, z))
             bezier_curve = BezierCurve3D(control_points, color='orange', name="Curva de Bézier")
-            self.objects.append(bezier_curve)
+            self.add_object(bezier_curve)
             self.curve_entry.delete(0, tk.END)
         except ValueError as e:
             tk.messagebox.showerror("Erro ao Adicionar Curva Bézier", f"Erro: {e}")
@@ -675,10 +716,13 @@ class Window:
     def toggle_projection(self):
         if self.projection_type == 'perspective':
             self.projection_type = 'parallel'
-            self.projection_button.config(text='Usar Projeção Perspectiva')
+            label = 'Usar Projeção Perspectiva'
         else:
             self.projection_type = 'perspective'
-            self.projection_button.config(text='Usar Projeção Paralela')
+            label = 'Usar Projeção Paralela'
+        if not self.headless:
+            self.projection_button.config(text=label)
+        self.invalidate()
 
     def on_mouse_wheel(self, event):
         if event.delta > 0:
@@ -691,50 +735,60 @@ class Window:
         self.scale *= 1.1  # Aumenta o scale em 10%
         if self.scale >= 1000:
             self.scale = 1000
+        self.invalidate()
 
     def zoom_out(self, event=None):
         """Diminui o zoom (afasta a cena)."""
         self.scale /= 1.1  # Diminui o scale em 10%
         if self.scale <= 250:
             self.scale = 250
+        self.invalidate()
 
     def rotate_left(self, event=None):
         self.yaw -= 5  # Graus
+        self.invalidate()
 
     def rotate_right(self, event=None):
         self.yaw += 5  # Graus
+        self.invalidate()
 
     def rotate_up(self, event=None):
         self.pitch += 5  # Graus
         self.pitch = min(self.pitch, 89)  # Limita o pitch a 89 graus
+        self.invalidate()
 
     def rotate_down(self, event=None):
         self.pitch -= 5  # Graus
         self.pitch = max(self.pitch, -89)  # Limita o pitch a -89 graus
+        self.invalidate()
 
     def move_forward(self, event=None):
         direction = self.get_direction_vector()
         self.eye[0] += direction[0] * 0.5
         self.eye[1] += direction[1] * 0.5
         self.eye[2] += direction[2] * 0.5
+        self.invalidate()
 
     def move_backward(self, event=None):
         direction = self.get_direction_vector()
         self.eye[0] -= direction[0] * 0.5
         self.eye[1] -= direction[1] * 0.5
         self.eye[2] -= direction[2] * 0.5
+        self.invalidate()
 
     def move_left(self, event=None):
         direction = self.get_right_vector()
         self.eye[0] -= direction[0] * 0.5
         self.eye[1] -= direction[1] * 0.5
         self.eye[2] -= direction[2] * 0.5
+        self.invalidate()
 
     def move_right(self, event=None):
         direction = self.get_right_vector()
         self.eye[0] += direction[0] * 0.5
         self.eye[1] += direction[1] * 0.5
         self.eye[2] += direction[2] * 0.5
+        self.invalidate()
 
     def get_direction_vector(self):
         """Calcula o vetor de direção baseado em yaw e pitch."""
@@ -800,10 +854,25 @@ class Window:
     def dot(self, a, b):
         return sum([a[i]*b[i] for i in range(3)])
 
+    def view_eye(self):
+        """Posição do observador no espaço da câmera, em coordenadas homogêneas.
+
+        Na projeção paralela o observador fica no infinito ao longo de +z (w = 0).
+        """
+        if self.projection_type == 'perspective':
+            return (0, 0, 0, 1)
+        return (0, 0, 1, 0)
+
     def project_point(self, x, y, z):
-        """Projeta um ponto 3D em 2D usando projeção em perspectiva ou paralela."""
+        """Projeta um ponto 3D em 2D usando projeção em perspectiva ou paralela.
+
+        Aceita coordenadas escalares ou arrays NumPy (vários pontos de uma vez).
+        """
         if self.projection_type == 'perspective':
-            if z != 0:
+            if np.ndim(z):
+                # Versão vetorizada: projeta um array de vértices de uma só vez
+                factor = self.scale / np.where(z != 0, z, 1)
+            elif z != 0:
                 factor = self.scale / z
             else:
                 factor = self.scale
@@ -816,59 +885,148 @@ class Window:
         return x, y
 
 
-    def calculate_average_distance(self, obj):
-        """Calcula a distância média dos vértices do objeto à câmera."""
-        distances = []
-        if isinstance(obj, Point3D):
-            distances.append(self.distance(obj.tx, obj.ty, obj.tz))
-        elif isinstance(obj, Line3D):
-            distances.append(self.distance(obj.start.tx, obj.start.ty, obj.start.tz))
-            distances.append(self.distance(obj.end.tx, obj.end.ty, obj.end.tz))
-        elif isinstance(obj, Polygon3D) or isinstance(obj, Cube3D) or isinstance(obj, Cone3D):
-            vertices = []
-            if isinstance(obj, Polygon3D):
-                vertices = obj.vertices
-            elif isinstance(obj, Cube3D):
-                vertices = obj.vertices
-            elif isinstance(obj, Cone3D):
-                vertices = [obj.apex, obj.base_center] + obj.base_vertices
-            for vertex in vertices:
-                distances.append(self.distance(vertex.tx, vertex.ty, vertex.tz))
-
-        if distances:
-            return sum(distances) / len(distances)
-        else:
-            return 0  # Se o objeto não tiver vértices, consideramos distância zero
+    def frustum_planes(self, view_matrix):
+        """Planos do volume de visão no espaço do mundo, array (5, 4).
 
-    def distance(self, x, y, z):
-        """Calcula a distância euclidiana do ponto (x, y, z) à câmera."""
-        ex, ey, ez = self.eye
-        return math.sqrt((x - ex) ** 2 + (y - ey) ** 2 + (z - ez) ** 2)
+        Um ponto p está dentro quando a·x + b·y + c·z + d >= 0 para todos os planos
+        (a, b, c, d). Os planos laterais correspondem às bordas da região de clipping
+        na tela; o quinto é o plano próximo (z <= -near_plane).
+        """
+        x_min, y_min, x_max, y_max = self.clip_region
+        cx, cy = self.center_x, self.center_y
+        if self.projection_type == 'perspective':
+            # Com d = -z: (cx - x_max) d <= scale x <= (cx - x_min) d e
+            # (y_min - cy) d <= scale y <= (y_max - cy) d (veja project_point)
+            planes = [
+                [1, 0, (cx - x_max) / self.scale, 0],
+                [-1, 0, -(cx - x_min) / self.scale, 0],
+                [0, 1, (y_min - cy) / self.scale, 0],
+                [0, -1, -(y_max - cy) / self.scale, 0],
+            ]
+        else:
+            factor = self.scale * 0.05  # Mesmo fator da projeção paralela em project_point
+            planes = [
+                [1, 0, 0, -(cx - x_max) / factor],
+                [-1, 0, 0, (cx - x_min) / factor],
+                [0, 1, 0, -(y_min - cy) / factor],
+                [0, -1, 0, (y_max - cy) / factor],
+            ]
+        planes.append([0, 0, -1, -render_settings.near_plane])
+        # Plano no espaço da câmera aplicado a V·p: no mundo o plano é (a, b, c, d)·V
+        planes = np.array(planes, dtype=float) @ np.asarray(view_matrix, dtype=float)
+        return planes / np.linalg.norm(planes[:, :3], axis=1)[:, None]
+
+    def transform_objects(self, objects, view_matrix):
+        """Leva os vértices dos objetos ao espaço da câmera (matriz de visualização · modelo)."""
+        view_matrix = np.asarray(view_matrix, dtype=float)
+        # Objetos sem matriz de modelo: todos os seus intervalos do buffer de uma só vez
+        self.vertex_buffer.transform(view_matrix, [obj.vertex_range for obj in objects
+                                                   if obj.contiguous and obj.model_matrix is None])
+        for obj in objects:
+            if not obj.contiguous:
+                # Objetos fora do buffer da cena (ou com pontos compartilhados)
+                obj.transform(obj.model_view(view_matrix))
+            elif obj.model_matrix is not None:
+                # Uma única multiplicação pela matriz combinada no intervalo do objeto
+                self.vertex_buffer.transform_range(obj.model_view(view_matrix), obj.vertex_range)
+
+    def depth_keys(self, objects):
+        """Distância de cada objeto ao observador, pelo centróide dos vértices transformados.
+
+        Os centróides dos objetos que ocupam o próprio intervalo do VertexBuffer saem
+        todos de uma vez, somando só as linhas desses intervalos; os demais usam obj.depth().
+        """
+        ranges = np.array([obj.vertex_range if obj.contiguous else (0, 0) for obj in objects], dtype=np.int64).reshape(-1, 2)
+        starts, ends = ranges[:, 0], ranges[:, 1]
+        counts = ends - starts
+        keys = np.zeros(len(objects))
+        filled = np.flatnonzero(counts > 0)
+        if len(filled):
+            # Índices das linhas dos intervalos visíveis, concatenados na ordem dos objetos
+            offsets = np.concatenate(([0], np.cumsum(counts[filled])[:-1]))
+            rows = np.arange(counts[filled].sum()) + np.repeat(starts[filled] - offsets, counts[filled])
+            sums = np.add.reduceat(self.vertex_buffer.transformed[rows, :3], offsets, axis=0)
+            keys[filled] = np.sqrt(((sums / counts[filled, None]) ** 2).sum(axis=1))
+        for i in np.flatnonzero(counts == 0).tolist():
+            keys[i] = objects[i].depth()
+        return keys
+
+    def invalidate(self):
+        """Marca o quadro como desatualizado e agenda um novo desenho."""
+        self.dirty = True
+        if self.pending_update is None and not self.headless:
+            # after_idle agrupa várias invalidações seguidas em um único quadro
+            self.pending_update = self.canvas.after_idle(self.update)
 
     def update(self):
-        self.canvas.delete('all')
-
-        # Desenha a margem da região de clipping
+        self.pending_update = None
+        if self.continuous_rendering:
+            # Modo contínuo: redesenha a cada 16 ms, mesmo sem mudanças (sem display,
+            # cada chamada de update() produz um quadro)
+            if not self.headless:
+                self.pending_update = self.canvas.after(16, self.update)
+        elif not self.dirty:
+            return
+        self.dirty = False
+
+        # Desenha a margem da região de clipping (o item é criado uma única vez)
         x_min, y_min, x_max, y_max = self.clip_region
-        self.canvas.create_rectangle(x_min, y_min, x_max, y_max, outline='black')
+        if self.clip_rectangle is None:
+            self.clip_rectangle = self.canvas.create_rectangle(x_min, y_min, x_max, y_max, outline='black')
+        else:
+            self.canvas.coords(self.clip_rectangle, x_min, y_min, x_max, y_max)
 
         view_matrix = self.get_view_matrix()
-
-        # Ordena os objetos de maior para menor distância (objetos mais distantes primeiro)
-        sorted_objects = sorted(self.objects, key=self.calculate_average_distance, reverse=True)
-
-        for obj in sorted_objects:
-            # Aplica a transformação (visualização) ao objeto
-            obj.transform(view_matrix)
+        eye = self.view_eye()
+
+        # Descarta, antes de qualquer trabalho por vértice, os objetos cuja esfera
+        # envolvente está fora do volume de visão (consulta hierárquica na BVH)
+        visible = self.spatial_index.query(self.frustum_planes(view_matrix))
+
+        self.transform_objects(visible, view_matrix)
+
+        # Ordena os objetos de maior para menor distância (objetos mais distantes primeiro),
+        # já com as coordenadas deste quadro. A ordenação parte da ordem do quadro
+        # anterior (objetos que acabaram de entrar no volume de visão vão para o fim):
+        # como ela muda pouco entre quadros, a ordenação estável (timsort) fica quase linear.
+        visible_set = set(visible)
+        previous_set = set(self.draw_order)
+        order = [obj for obj in self.draw_order if obj in visible_set]
+        order += [obj for obj in visible if obj not in previous_set]
+        keys = self.depth_keys(order)
+        self.draw_order = [order[i] for i in np.argsort(-keys, kind='stable').tolist()]
+
+        drawn_objects = []
+        restack = False
+        for obj in self.draw_order:
             # Aplica o clipping simples em Z
             if obj.is_visible():
+                # Descarta as faces de trás antes de projetar e recortar
+                obj.cull(eye, view_matrix)
                 # Aplica a projeção ao objeto
                 obj.project(self.project_point)
-                # Desenha o objeto no canvas com o clipping 2D
-                obj.draw(self.canvas, self.clip_region)
-
-        # Atualiza a tela
-        self.canvas.after(16, self.update)
+                # Desenha o objeto no canvas com o clipping 2D, reaproveitando os itens
+                obj.render(self.canvas, self.clip_region)
+                drawn_objects.append(obj)
+                restack = restack or obj.canvas_items.created
+
+        # Esconde os itens dos objetos desenhados no quadro anterior que saíram de cena
+        drawn_set = set(drawn_objects)
+        for obj in self.drawn_objects:
+            if obj not in drawn_set:
+                obj.hide(self.canvas)
+
+        # Os itens reaproveitados mantêm sua posição na pilha do canvas; ela só
+        # precisa ser refeita quando a ordem de desenho muda ou surgem itens novos
+        if restack or drawn_objects != self.drawn_objects:
+            for obj in drawn_objects:
+                self.canvas.tag_raise(obj.canvas_items.tag)
+        self.drawn_objects = drawn_objects
+
+    def save_frame(self, path):
+        """Desenha o quadro atual no framebuffer e grava em PNG ou PPM (modo headless)."""
+        self.update()
+        self.canvas.save(path)
 
     def export_obj_file(self):
         """Exporta todos os objetos da cena para um arquivo OBJ."""
@@ -881,6 +1039,9 @@ class Window:
         if not file_path:
             return  # O usuário cancelou
 
+        # Objetos fora da tela não foram transformados no último quadro
+        self.transform_objects(self.objects, self.get_view_matrix())
+
         try:
             with open(file_path, 'w') as obj_file:
                 obj_file.write("# Exportação de todos os objetos da cena\n")
@@ -891,7 +1052,10 @@ class Window:
 
                 # Primeiro, coleta todos os vértices
                 for obj in self.objects:
-                    if isinstance(obj, (Point3D, Line3D, Polygon3D, Cube3D, Cone3D, BezierSurface3D)):
+                    keys = []
+                    if isinstance(obj, Mesh3D):
+                        keys = [tuple(row) for row in obj.transformed[:, :3].tolist()]
+                    elif isinstance(obj, (Point3D, Line3D, Polygon3D, BezierSurface3D)):
                         vertices = []
                         if isinstance(obj, Point3D):
                             vertices = [obj]
@@ -899,24 +1063,20 @@ class Window:
                             vertices = [obj.start, obj.end]
                         elif isinstance(obj, Polygon3D):
                             vertices = obj.vertices
-                        elif isinstance(obj, Cube3D):
-                            vertices = obj.vertices
-                        elif isinstance(obj, Cone3D):
-                            vertices = [obj.apex, obj.base_center] + obj.base_vertices
                         elif isinstance(obj, BezierSurface3D):
                             for row in obj.control_points:
                                 vertices.extend(row)
-                        # Adiciona vértices únicos
-                        for vertex in vertices:
-                            key = (vertex.tx, vertex.ty, vertex.tz)
-                            if key not in vertex_indices:
-                                vertex_indices[key] = current_index
-                                vertex_list.append(vertex)
-                                current_index += 1
+                        keys = [(vertex.tx, vertex.ty, vertex.tz) for vertex in vertices]
+                    # Adiciona vértices únicos
+                    for key in keys:
+                        if key not in vertex_indices:
+                            vertex_indices[key] = current_index
+                            vertex_list.append(key)
+                            current_index += 1
 
                 # Escreve todos os vértices
-                for vertex in vertex_list:
-                    obj_file.write(f"v {vertex.tx} {vertex.ty} {vertex.tz}\n")
+                for x, y, z in vertex_list:
+                    obj_file.write(f"v {x} {y} {z}\n")
 
                 # Agora, escreve cada objeto
                 for obj in self.objects:
@@ -934,20 +1094,14 @@ class Window:
                         indices = [vertex_indices[(v.tx, v.ty, v.tz)] for v in obj.vertices]
                         face_line = " ".join(map(str, indices))
                         obj_file.write(f"f {face_line}\n")
-                    elif isinstance(obj, Cube3D):
-                        for face in obj.faces:
-                            indices = [vertex_indices[(v.tx, v.ty, v.tz)] for v in face.vertices]
-                            face_line = " ".join(map(str, indices))
-                            obj_file.write(f"f {face_line}\n")
-                    elif isinstance(obj, Cone3D):
-                        for face in obj.faces:
-                            indices = [vertex_indices[(v.tx, v.ty, v.tz)] for v in face.vertices]
+                    elif isinstance(obj, Mesh3D):
+                        keys = [tuple(row) for row in obj.transformed[:, :3].tolist()]
+                        for face, size in zip(obj.faces.tolist(), obj.face_sizes.tolist()):
+                            indices = [vertex_indices[keys[i]] for i in face[:size]]
                             face_line = " ".join(map(str, indices))
                             obj_file.write(f"f {face_line}\n")
-                        # Base do cone
-                        base_indices = [vertex_indices[(v.tx, v.ty, v.tz)] for v in obj.base_face.vertices]
-                        base_face_line = " ".join(map(str, base_indices))
-                        obj_file.write(f"f {base_face_line}\n")
+                        for start, end in obj.lines.tolist():
+                            obj_file.write(f"l {vertex_indices[keys[start]]} {vertex_indices[keys[end]]}\n")
                     elif isinstance(obj, BezierSurface3D):
                         # Exportar superfícies bicúbicas de Bézier pode ser complexo.
                         # Para simplicidade, ignoraremos neste exemplo.
@@ -960,6 +1114,20 @@ class Window:
         except Exception as e:
             messagebox.showerror("Erro na Exportação", f"Ocorreu um erro ao exportar os objetos:\n{e}")
 
+    def add_imported_mesh(self, vertices, faces, lines, name, storage=None):
+        """Cria uma malha indexada com as faces e linhas de um objeto do arquivo OBJ."""
+        if not len(faces) and not len(lines):
+            return
+        if storage is not None:
+            # Malha grande: vértices e índices em arquivos mapeados
+            mesh = MappedMesh3D(storage, vertices, faces, lines, color='purple', name=name)
+        else:
+            mesh = Mesh3D(vertices, faces, lines,
+                          color='purple',
+                          fill_color=None,  # Não preenche por padrão
+                          name=name)
+        self.add_object(mesh)
+
     def import_obj_file(self):
         """Importa objetos de um arquivo OBJ e adiciona à cena."""
         # Abre um diálogo para selecionar o arquivo OBJ
@@ -971,77 +1139,45 @@ class Window:
             return  # O usuário cancelou
 
         try:
-            with open(file_path, 'r') as obj_file:
-                vertices = []
-                current_object = None
-                current_object_name = "Objeto_importado"
-                lines = obj_file.readlines()
-
-                for line in lines:
-                    if line.startswith('#') or line.strip() == '':
-                        continue  # Ignora comentários e linhas vazias
-                    parts = line.strip().split()
-                    if not parts:
-                        continue
-                    if parts[0] == 'o':
-                        # Novo objeto
-                        if current_object:
-                            self.objects.append(current_object)
-                        current_object_name = ' '.join(parts[1:]) if len(parts) > 1 else "Objeto_importado"
-                        current_object = None
-                    elif parts[0] == 'v':
-                        # Vértice
-                        x, y, z = map(float, parts[1:4])
-                        vertices.append(Point3D(x, y, z))
-                    elif parts[0] == 'p':
-                        # Ponto
-                        idx = int(parts[1]) - 1  # OBJ indices começam em 1
-                        if 0 <= idx < len(vertices):
-                            p = vertices[idx]
-                            if current_object is None:
-                                current_object = Point3D(p.x, p.y, p.z, color='green', name=current_object_name)
-                            else:
-                                # Adiciona mais pontos ao objeto existente, se necessário
-                                pass  # Pode implementar múltiplos pontos em um objeto
-                    elif parts[0] == 'l':
-                        # Linha
-                        indices = [int(idx) - 1 for idx in parts[1:]]
-                        if len(indices) >= 2:
-                            start = vertices[indices[0]]
-                            end = vertices[indices[1]]
-                            line_obj = Line3D(Point3D(start.x, start.y, start.z, color='red'), 
-                                              Point3D(end.x, end.y, end.z, color='red'),
-                                              color='red',
-                                              name=current_object_name)
-                            self.objects.append(line_obj)
-                    elif parts[0] == 'f':
-                        # Face
-                        face_indices = []
-                        for part in parts[1:]:
-                            idx = part.split('/')[0]  # Ignora textura e normais
-                            face_indices.append(int(idx) - 1)
-                        face_vertices = [vertices[idx] for idx in face_indices]
-                        polygon = Polygon3D([Point3D(v.x, v.y, v.z) for v in face_vertices],
-                                            color='purple',
-                                            fill_color=None,  # Não preenche por padrão
-                                            name=current_object_name)
-                        self.objects.append(polygon)
-                    # Outros comandos como 'vn', 'vt' podem ser adicionados aqui se necessário
-
-                # Adiciona o último objeto, se existir
-                if current_object:
-                    self.objects.append(current_object)
+            # Usa o cache binário do arquivo, se ainda for válido; senão lê o arquivo em
+            # blocos (cada objeto ou grupo vira uma única malha indexada) e grava o cache
+            start = time.perf_counter()
+            cache = ObjCache(file_path)
+            groups = cache.load()
+            reader = None
+            if groups is None:
+                reader = ObjReader(file_path)
+                groups = cache.store(reader.groups())
+            for index, (name, vertices, faces, lines, points) in enumerate(groups):
+                storage = None
+                if len(vertices) >= self.memmap_vertices and os.path.isdir(cache.directory):
+                    storage = cache.mesh_directory(index)
+                if storage is not None and reader is None and os.path.exists(os.path.join(storage, 'meta.json')):
+                    # Malha já gravada por uma importação anterior: só abre os arquivos
+                    self.add_object(MappedMesh3D(storage, color='purple', name=name))
+                else:
+                    self.add_imported_mesh(vertices, faces, lines, name, storage)
+                for x, y, z in vertices[points].tolist():
+                    self.add_object(Point3D(x, y, z, color='green', name=name))
 
             # Atualiza a lista de objetos na interface
             self.object_listbox.delete(0, tk.END)
             for obj in self.objects:
                 self.object_listbox.insert(tk.END, obj.name)
 
-            messagebox.showinfo("Importação concluída", f"Objetos importados de {file_path}")
+            if reader is None:
+                summary = f"Carregado do cache em {time.perf_counter() - start:.2f} s"
+            else:
+                summary = (f"{reader.bytes_read / 1e6:.1f} MB lidos em {reader.elapsed:.2f} s "
+                           f"({reader.throughput():.1f} MB/s)")
+            messagebox.showinfo("Importação concluída", f"Objetos importados de {file_path}\n{summary}")
         except Exception as e:
             messagebox.showerror("Erro na Importação", f"Ocorreu um erro ao importar o arquivo OBJ:\n{e}")
 
     def run(self):
+        if self.headless:
+            self.update()  # Sem display não há laço de eventos: desenha o quadro atual
+            return
         self.root.mainloop()
 
 if __name__ == '__main__':
@@ -0,0 +1,346 @@
+import numpy as np
+import json
+import os
+import shutil
+import time
+import warnings
+
+from array import array
+
+
+class ObjGroup:
+    """Faces, linhas e pontos de um objeto ('o') ou grupo ('g') de um arquivo OBJ."""
+    def __init__(self, name):
+        self.name = name
+        self.face_indices = array('q')  # Índices globais (a partir de 0) de todas as faces, concatenados
+        self.face_sizes = array('q')  # Número de vértices de cada face
+        self.lines = array('q')  # Pares de índices dos segmentos
+        self.points = array('q')  # Índices dos pontos
+
+    def is_empty(self):
+        return not (self.face_sizes or self.lines or self.points)
+
+    def indexed(self, vertices):
+        """Vértices usados pelo grupo e os índices renumerados para eles.
+
+        Retorna (vertices, faces, lines, points), com faces como um array (F, K)
+        preenchido com -1, no formato aceito por Mesh3D.
+        """
+        face_indices = np.frombuffer(self.face_indices, dtype=np.int64)
+        sizes = np.frombuffer(self.face_sizes, dtype=np.int64)
+        lines = np.frombuffer(self.lines, dtype=np.int64)
+        points = np.frombuffer(self.points, dtype=np.int64)
+        # Mantém apenas os vértices usados pelo grupo e renumera os índices
+        used, remapped = np.unique(np.concatenate((face_indices, lines, points)), return_inverse=True)
+        face_indices, lines, points = np.split(remapped, np.cumsum([len(face_indices), len(lines)]))
+        return vertices[used], pad_face_indices(face_indices, sizes), lines.reshape(-1, 2), points
+
+
+class ObjReader:
+    """Leitor de arquivos OBJ em blocos, que gera uma malha indexada por objeto ou grupo."""
+    def __init__(self, path, chunk_size=1 << 24, default_name="Objeto_importado"):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.default_name = default_name
+        self.coordinates = array('d')  # x, y, z de todos os vértices do arquivo
+        self.group = ObjGroup(default_name)
+        self.bytes_read = 0
+        self.elapsed = 0.0  # Tempo gasto na leitura (sem contar quem consome os grupos)
+
+    def throughput(self):
+        """Velocidade da leitura em MB/s."""
+        return self.bytes_read / 1e6 / max(self.elapsed, 1e-9)
+
+    def vertex_count(self):
+        return len(self.coordinates) // 3
+
+    def groups(self):
+        """Gera (nome, vertices, faces, lines, points) para cada objeto ou grupo do arquivo.
+
+        Os vértices são restritos aos usados pelo grupo. Linhas 'l' com mais de
+        dois vértices viram uma sequência de segmentos, faces 'f' podem ter
+        qualquer número de vértices e índices negativos são relativos ao fim da
+        lista de vértices lida até aqui.
+        """
+        start = time.perf_counter()
+        with open(self.path, 'rb') as obj_file:
+            leftover = b''
+            while True:
+                chunk = obj_file.read(self.chunk_size)
+                if not chunk:
+                    break
+                self.bytes_read += len(chunk)
+                # A última linha incompleta do bloco fica para o próximo
+                chunk = leftover + chunk
+                end = chunk.rfind(b'\n') + 1
+                chunk, leftover = chunk[:end], chunk[end:]
+                for group in self.parse_chunk(chunk):
+                    self.elapsed += time.perf_counter() - start
+                    yield group
+                    start = time.perf_counter()
+        groups = list(self.parse_chunk(leftover + b'\n')) if leftover.strip() else []
+        # Adiciona o último objeto, se existir
+        if not self.group.is_empty():
+            groups.append(self.finish())
+        self.elapsed += time.perf_counter() - start
+        yield from groups
+
+    def finish(self):
+        vertices = np.frombuffer(self.coordinates, dtype=float).reshape(-1, 3)
+        return (self.group.name,) + self.group.indexed(vertices)
+
+    def parse_chunk(self, chunk):
+        """Processa um bloco de linhas completas, gerando os grupos encerrados nele."""
+        if not chunk:
+            return
+        data = np.frombuffer(chunk, dtype=np.uint8)
+        starts = np.concatenate(([0], np.flatnonzero(data[:-1] == 10) + 1))
+        # Tipo de cada linha pelos seus dois primeiros bytes ('v ', 'vn', 'f ', ...)
+        second = np.minimum(starts + 1, len(data) - 1)
+        kinds = data[starts].astype(np.int64) * 256 + data[second]
+        # Sequências de linhas consecutivas do mesmo tipo
+        boundaries = np.concatenate(([0], np.flatnonzero(kinds[1:] != kinds[:-1]) + 1, [len(starts)]))
+        bounds = np.append(starts, len(data))
+        for first, last in zip(boundaries[:-1].tolist(), boundaries[1:].tolist()):
+            block = chunk[bounds[first]:bounds[last]]
+            kind = block[:2]
+            if kind in (b'v ', b'v\t') and self.parse_vertex_block(block):
+                continue
+            if kind in (b'f ', b'f\t') and self.parse_face_block(block):
+                continue
+            for line in block.decode('utf-8', errors='replace').splitlines():
+                group = self.parse_line(line)
+                if group is not None:
+                    yield group
+
+    def parse_vertex_block(self, block):
+        """Converte uma sequência de linhas 'v' de uma só vez; False se ela foge do formato."""
+        text = block.replace(b'v', b' ')
+        values = parse_numbers(text, float)
+        words = word_starts(text)
+        if values is None or len(values) != len(words):
+            return False
+        counts = words_per_line(text, words)
+        if not (counts == 3).all():
+            if (counts < 3).any():
+                return False
+            # Coordenada w ou cores por vértice: usa só x, y e z
+            offsets = np.cumsum(counts) - counts
+            values = values[offsets[:, None] + np.arange(3)]
+        self.coordinates.frombytes(np.ascontiguousarray(values, dtype=float).tobytes())
+        return True
+
+    def parse_face_block(self, block):
+        """Converte uma sequência de linhas 'f' de uma só vez; False se ela foge do formato."""
+        text = block.replace(b'f', b' ')
+        words = word_starts(text)  # Uma palavra por vértice da face
+        if b'/' in text:
+            # Referências 'v/vt/vn': com o mesmo número de campos em todas as palavras,
+            # o índice do vértice é o primeiro campo de cada grupo
+            fields_text = text.replace(b'/', b' ')
+            fields = word_starts(fields_text)
+            width = len(fields) // max(len(words), 1)
+            if len(fields) != width * len(words) or not np.array_equal(fields[::width], words):
+                return False
+            values = parse_numbers(fields_text, np.int64)
+            if values is None or len(values) != len(fields):
+                return False
+            values = values[::width]
+        else:
+            values = parse_numbers(text, np.int64)
+            if values is None or len(values) != len(words):
+                return False
+        counts = words_per_line(text, words)
+        if (counts < 1).any():
+            return False
+        indices = np.where(values < 0, self.vertex_count() + values, values - 1)
+        self.group.face_indices.frombytes(indices.astype(np.int64).tobytes())
+        self.group.face_sizes.frombytes(counts.astype(np.int64).tobytes())
+        return True
+
+    def parse_line(self, line):
+        """Processa uma única linha; retorna o grupo encerrado por ela, se houver."""
+        parts = line.split('#', 1)[0].split()
+        if not parts:
+            return None  # Ignora comentários e linhas vazias
+        keyword = parts[0]
+        group = self.group
+        if keyword == 'v':
+            # Vértice (uma eventual coordenada w é ignorada)
+            self.coordinates.extend(map(float, parts[1:4]))
+        elif keyword == 'f':
+            # Face: qualquer número de vértices
+            count = self.vertex_count()
+            group.face_indices.extend(resolve_index(token, count) for token in parts[1:])
+            group.face_sizes.append(len(parts) - 1)
+        elif keyword == 'l':
+            # Linha poligonal: um segmento entre cada par de vértices consecutivos
+            count = self.vertex_count()
+            indices = [resolve_index(token, count) for token in parts[1:]]
+            for start, end in zip(indices, indices[1:]):
+                group.lines.extend((start, end))
+        elif keyword == 'p':
+            # Pontos
+            count = self.vertex_count()
+            group.points.extend(resolve_index(token, count) for token in parts[1:])
+        elif keyword in ('o', 'g'):
+            # Novo objeto ou grupo
+            finished = None if group.is_empty() else self.finish()
+            self.group = ObjGroup(' '.join(parts[1:]) or self.default_name)
+            return finished
+        # Outros comandos como 'vn', 'vt' podem ser adicionados aqui se necessário
+        return None
+
+
+def parse_numbers(text, dtype):
+    """Todos os números separados por espaços de um bloco de texto, de uma só vez.
+
+    Retorna None se algum campo não é um número (comentário no fim da linha,
+    campo inválido): a sequência é então lida linha a linha. A conversão parcial
+    do np.fromstring é tratada como erro, e não como aviso, para não depender do
+    comportamento obsoleto que ela tem hoje.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            return np.fromstring(text, dtype=dtype, sep=' ')
+        except (ValueError, DeprecationWarning):
+            return None
+
+def word_starts(text):
+    """Posições dos inícios de palavra (não-espaço precedido de espaço) de um bloco."""
+    data = np.frombuffer(text, dtype=np.uint8)
+    space = data <= 32
+    start = ~space
+    start[1:] &= space[:-1]
+    return np.flatnonzero(start)
+
+def words_per_line(text, words):
+    """Número de palavras de cada linha de um bloco terminado por uma quebra de linha."""
+    line_ends = np.flatnonzero(np.frombuffer(text, dtype=np.uint8) == 10)
+    return np.diff(np.searchsorted(words, line_ends), prepend=0)
+
+def pad_face_indices(indices, sizes):
+    """Converte índices concatenados e tamanhos das faces em um array (F, K) preenchido com -1."""
+    width = int(sizes.max()) if len(sizes) else 0
+    faces = np.full((len(sizes), width), -1, dtype=np.int64)
+    rows = np.repeat(np.arange(len(sizes)), sizes)
+    columns = np.arange(len(indices)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    faces[rows, columns] = indices
+    return faces
+
+def resolve_index(token, vertex_count):
+    """Índice (a partir de 0) de uma referência a vértice 'v', 'v/vt' ou 'v/vt/vn'.
+
+    Índices negativos são relativos ao fim da lista de vértices lida até aqui.
+    """
+    index = int(token.split('/', 1)[0])
+    if index < 0:
+        return vertex_count + index
+    return index - 1  # OBJ indices começam em 1
+
+
+class ObjCache:
+    """Cache binário, no diretório '<arquivo>.cache', com os grupos de um arquivo OBJ já convertidos."""
+    VERSION = 1
+    # Nome -> (tipo, colunas) de cada array gravado
+    ARRAYS = {
+        'vertices': (np.float64, 3),
+        'face_indices': (np.int64, None),
+        'face_sizes': (np.int64, None),
+        'lines': (np.int64, 2),
+        'points': (np.int64, None),
+    }
+
+    def __init__(self, path):
+        self.path = path
+        self.directory = str(path) + '.cache'
+
+    def mesh_directory(self, index):
+        """Diretório dos arquivos np.memmap da malha do grupo `index` (ver Mesh3D)."""
+        return os.path.join(self.directory, f'mesh_{index}')
+
+    def key(self):
+        """Identificação do arquivo de origem (caminho, tamanho e data de modificação)."""
+        status = os.stat(self.path)
+        return {'path': os.path.abspath(self.path), 'size': status.st_size,
+                'mtime': status.st_mtime_ns, 'version': self.VERSION}
+
+    def load(self):
+        """Lista de grupos (como em ObjReader.groups()) ou None se o cache não é válido."""
+        try:
+            with open(os.path.join(self.directory, 'meta.json'), 'r') as meta_file:
+                meta = json.load(meta_file)
+            if meta['key'] != self.key():
+                return None
+            arrays = {}
+            for name, (dtype, columns) in self.ARRAYS.items():
+                total = int(sum(counts[name] for counts in meta['groups']))
+                shape = (total,) if columns is None else (total, columns)
+                if total == 0:
+                    arrays[name] = np.empty(shape, dtype=dtype)
+                else:
+                    arrays[name] = np.memmap(os.path.join(self.directory, name + '.bin'),
+                                             dtype=dtype, mode='r', shape=shape)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        groups = []
+        offsets = dict.fromkeys(self.ARRAYS, 0)
+        for counts in meta['groups']:
+            parts = {}
+            for name in self.ARRAYS:
+                parts[name] = arrays[name][offsets[name]:offsets[name] + counts[name]]
+                offsets[name] += counts[name]
+            faces = pad_face_indices(parts['face_indices'], parts['face_sizes'])
+            groups.append((counts['name'], parts['vertices'], faces, parts['lines'], parts['points']))
+        return groups
+
+    def store(self, groups):
+        """Repassa os grupos gerados pelo leitor, gravando cada um no cache.
+
+        O meta.json só é gravado depois do último grupo, de modo que uma leitura
+        interrompida deixa um cache inválido, nunca um incompleto. Erros de
+        gravação (diretório sem permissão, disco cheio) só desativam o cache.
+        """
+        files = {}
+        meta = []
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            meta_path = os.path.join(self.directory, 'meta.json')
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            # Malhas mapeadas de uma versão anterior do arquivo
+            for entry in os.listdir(self.directory):
+                if entry.startswith('mesh_'):
+                    shutil.rmtree(os.path.join(self.directory, entry))
+            for name in self.ARRAYS:
+                files[name] = open(os.path.join(self.directory, name + '.bin'), 'wb')
+        except OSError:
+            for data_file in files.values():
+                data_file.close()
+            files = None
+
+        for name, vertices, faces, lines, points in groups:
+            if files is not None:
+                valid = faces >= 0
+                parts = {'vertices': vertices, 'face_indices': faces[valid],
+                         'face_sizes': valid.sum(axis=1), 'lines': lines, 'points': points}
+                try:
+                    for key, (dtype, columns) in self.ARRAYS.items():
+                        files[key].write(np.ascontiguousarray(parts[key], dtype=dtype).tobytes())
+                    meta.append(dict({key: len(parts[key]) for key in self.ARRAYS}, name=name))
+                except OSError:
+                    for data_file in files.values():
+                        data_file.close()
+                    files = None
+            yield name, vertices, faces, lines, points
+
+        if files is not None:
+            try:
+                for data_file in files.values():
+                    data_file.close()
+                with open(meta_path, 'w') as meta_file:
+                    json.dump({'key': self.key(), 'groups': meta}, meta_file)
+            except OSError:
+                pass
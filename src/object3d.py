@@ -1,18 +1,140 @@
 import numpy as np
 import math
+import json
+import os
 
 from clipping import *
-
+from vertex_buffer import *
+from canvas_items import *
+from basis import *
+
+
+class RenderSettings:
+    """Configurações globais de qualidade, usadas quando o objeto não define as suas."""
+    def __init__(self):
+        self.curve_steps = 100  # Segmentos por curva na tesselação uniforme
+        self.adaptive_curves = False  # Tesselação adaptativa das curvas em espaço de tela
+        self.curve_tolerance = 0.5  # Distância máxima (pixels) entre a corda e a curva
+        self.max_curve_steps = 1000  # Limite de segmentos da tesselação adaptativa
+        self.surface_lod_pixels = 16  # Tamanho aproximado (pixels) de cada divisão das superfícies
+        self.surface_min_steps = 2  # Nível de detalhe mais grosseiro das superfícies
+        self.surface_max_steps = 32  # Nível de detalhe mais fino das superfícies
+        self.backface_culling = True  # Descarta as faces de trás das malhas fechadas
+        self.near_plane = 0.1  # Distância do plano próximo (recorte em z = -near_plane)
+
+render_settings = RenderSettings()
 
 class Object3D:
     def __init__(self, name=''):
         self.name = name  # Nome do objeto
+        self.buffer = None  # VertexBuffer da cena (após attach)
+        self.vertex_range = None  # Intervalo (início, fim) no VertexBuffer da cena
+        self.canvas_items = None  # Itens do canvas reaproveitados entre quadros
+        self.contiguous = False  # Todos os pontos ocupam vertex_range, na ordem de points()
+        self.bounds = None  # Esfera envolvente (centro, raio) no espaço do mundo, em cache
+        self.local_bounds = None  # Caixa (mínimo, máximo) dos pontos no espaço do objeto, em cache
+        # Matriz de modelo (None = identidade): as transformações do objeto se acumulam
+        # nela e os vértices originais nunca são alterados
+        self.model_matrix = None
 
     """Classe base para todos os objetos 3D."""
+    def points(self):
+        """Retorna os pontos (Point3D) distintos que compõem o objeto."""
+        return []
+
+    def attach(self, buffer):
+        """Move os vértices do objeto para um intervalo contíguo do VertexBuffer."""
+        all_points = self.points()
+        points = [p for p in all_points if p.buffer is None]
+        start = buffer.allocate(len(points))
+        for i, point in enumerate(points):
+            point.attach_to(buffer, start + i)
+        self.buffer = buffer
+        self.vertex_range = (start, start + len(points))
+        # Pontos compartilhados com objetos já registrados ficam fora do intervalo
+        self.contiguous = len(points) == len(all_points)
+
+    def transformed_points(self):
+        """Coordenadas transformadas dos pontos do objeto como um array (n, 3)."""
+        points = self.points()
+        if self.vertex_range is not None:
+            start, end = self.vertex_range
+            # Os pontos ocupam um intervalo contíguo do buffer, na mesma ordem
+            if end - start == len(points):
+                return self.buffer.transformed[start:end, :3]
+        return np.array([(p.tx, p.ty, p.tz) for p in points], dtype=float).reshape(-1, 3)
+
+    def local_points(self):
+        """Coordenadas originais (espaço do objeto) dos pontos como um array (n, 3)."""
+        points = self.points()
+        if self.vertex_range is not None and self.contiguous:
+            start, end = self.vertex_range
+            return self.buffer.vertices[start:end, :3]
+        return np.array([(p.x, p.y, p.z) for p in points], dtype=float).reshape(-1, 3)
+
+    def world_points(self):
+        """Coordenadas dos pontos no espaço do mundo (com a matriz de modelo), array (n, 3)."""
+        points = self.local_points()
+        if self.model_matrix is None:
+            return points
+        return points @ self.model_matrix[:3, :3].T + self.model_matrix[:3, 3]
+
+    def model_view(self, view_matrix):
+        """Matriz que leva os pontos do objeto ao espaço da câmera (visualização · modelo)."""
+        if self.model_matrix is None:
+            return view_matrix
+        return np.asarray(view_matrix, dtype=float) @ self.model_matrix
+
+    def bounding_sphere(self):
+        """Esfera envolvente (centro, raio) do objeto no espaço do mundo.
+
+        A caixa dos pontos no espaço do objeto é calculada uma única vez; depois de
+        uma transformação basta levar os seus 8 cantos pela matriz de modelo.
+        Fica em cache até invalidate_bounds(), chamado pelas transformações do objeto.
+        """
+        if self.bounds is None:
+            if self.local_box():
+                low, high = self.local_box()
+                corners = np.array([(x, y, z) for x in (low[0], high[0]) for y in (low[1], high[1]) for z in (low[2], high[2])])
+                if self.model_matrix is not None:
+                    corners = corners @ self.model_matrix[:3, :3].T + self.model_matrix[:3, 3]
+                low, high = corners.min(axis=0), corners.max(axis=0)
+                self.bounds = ((low + high) / 2, float(np.sqrt(((high - low) ** 2).sum())) / 2)
+            else:
+                self.bounds = (np.zeros(3), np.inf)  # Sem pontos: nunca é descartado
+        return self.bounds
+
+    def local_box(self):
+        """Caixa (mínimo, máximo) dos pontos no espaço do objeto, em cache (() sem pontos)."""
+        if self.local_bounds is None:
+            points = self.local_points()
+            self.local_bounds = (points.min(axis=0), points.max(axis=0)) if len(points) else ()
+        return self.local_bounds
+
+    def invalidate_bounds(self):
+        """Descarta a esfera envolvente em cache (a matriz de modelo mudou)."""
+        self.bounds = None
+
     def transform(self, view_matrix):
         """Aplica a transformação (visualização) ao objeto."""
         pass
 
+    def depth(self):
+        """Distância do centróide dos pontos transformados ao observador (origem da câmera)."""
+        points = self.transformed_points()
+        if not len(points):
+            return 0.0
+        return float(np.sqrt((points.mean(axis=0) ** 2).sum()))
+
+    def cull(self, eye, view_matrix):
+        """Descarta as partes do objeto que não podem ser vistas do observador.
+
+        eye: posição do observador no espaço da câmera em coordenadas homogêneas
+        (w = 0 indica um observador no infinito, como na projeção paralela).
+        view_matrix: matriz de visualização do quadro (combinada com a de modelo).
+        """
+        pass
+
     def project(self, project_func):
         """Projeta o objeto 3D em 2D."""
         pass
@@ -21,17 +143,96 @@ class Object3D:
         """Desenha o objeto no canvas."""
         pass
 
+    def render(self, canvas, clip_region):
+        """Desenha o objeto reaproveitando os itens do canvas do quadro anterior."""
+        if self.canvas_items is None:
+            self.canvas_items = CanvasItems(f"obj{id(self)}")
+        self.canvas_items.begin()
+        self.draw(canvas, clip_region)
+        self.canvas_items.end(canvas)
+
+    def hide(self, canvas):
+        """Esconde os itens do objeto quando ele não é desenhado no quadro."""
+        if self.canvas_items is not None:
+            self.canvas_items.hide(canvas)
+
+    def project_segments(self, starts, ends, project_func):
+        """Recorta segmentos 3D (espaço da câmera) pelo plano próximo e projeta os extremos.
+
+        Retorna um array (N, 4) com os segmentos (x0, y0, x1, y1) na tela.
+        """
+        return project_segments_near(starts, ends, project_func)
+
+    def draw_segments(self, canvas, segments, clip_region, **options):
+        """Recorta em lote um array (N, 4) de segmentos e desenha os que restarem."""
+        segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        clipped, _ = liang_barsky_clip_batch(segments[:, 0], segments[:, 1], segments[:, 2], segments[:, 3], clip_region)
+        for segment in clipped.tolist():
+            self.canvas_items.line(canvas, segment, **options)
+
+    def draw_polygons(self, canvas, polygons, clip_region, sizes=None, fill_color=None, color='black'):
+        """Recorta em lote um array (P, K, 2) de polígonos e desenha os que restarem."""
+        clipped, _ = sutherland_hodgman_clip_batch(polygons, clip_region, sizes)
+        for flat_points in clipped:
+            if fill_color:
+                self.canvas_items.polygon(canvas, flat_points, fill=fill_color, outline=color)
+            else:
+                # Desenha apenas as arestas do polígono sem preenchimento
+                self.canvas_items.line(canvas, flat_points + flat_points[:2], fill=color)
+
+def project_segments_near(starts, ends, project_func):
+    """Recorta segmentos 3D pelo plano próximo e projeta os extremos, array (N, 4)."""
+    starts, ends, _ = clip_segments_near(starts, ends, render_settings.near_plane)
+    points = np.concatenate((starts, ends))
+    x, y = project_func(points[:, 0], points[:, 1], points[:, 2])
+    count = len(starts)
+    return np.column_stack((x[:count], y[:count], x[count:], y[count:]))
+
+class BufferedCoordinate:
+    """Coordenada de um Point3D, lida do VertexBuffer quando o ponto está registrado."""
+    def __init__(self, array_name, column):
+        self.array_name = array_name  # 'vertices' ou 'transformed'
+        self.column = column
+
+    def __get__(self, point, owner=None):
+        if point is None:
+            return self
+        if point.buffer is None:
+            return point.local[self.array_name][self.column]
+        return float(getattr(point.buffer, self.array_name)[point.index, self.column])
+
+    def __set__(self, point, value):
+        if point.buffer is None:
+            point.local[self.array_name][self.column] = value
+        else:
+            getattr(point.buffer, self.array_name)[point.index, self.column] = value
+
 class Point3D(Object3D):
     """Classe para representar um ponto em 3D."""
+    x = BufferedCoordinate('vertices', 0)  # Coordenadas originais
+    y = BufferedCoordinate('vertices', 1)
+    z = BufferedCoordinate('vertices', 2)
+    tx = BufferedCoordinate('transformed', 0)  # Coordenadas transformadas
+    ty = BufferedCoordinate('transformed', 1)
+    tz = BufferedCoordinate('transformed', 2)
+
     def __init__(self, x, y, z, color='green', name=""):
         super().__init__(name)
-        self.x = x  # Coordenadas originais
-        self.y = y
-        self.z = z
+        self.index = None   # Linha do ponto no VertexBuffer
+        # Armazenamento local enquanto o ponto não pertence a um VertexBuffer
+        self.local = {'vertices': [x, y, z], 'transformed': [x, y, z]}
         self.color = color
-        self.tx = self.x  # Coordenadas transformadas
-        self.ty = self.y
-        self.tz = self.z
+
+    def points(self):
+        return [self]
+
+    def attach_to(self, buffer, index):
+        """Copia o ponto para a linha `index` do buffer e passa a usá-la."""
+        buffer.vertices[index, :3] = self.local['vertices']
+        buffer.transformed[index, :3] = self.local['transformed']
+        self.buffer = buffer
+        self.index = index
+        self.local = None
 
     def transform(self, view_matrix):
         x, y, z = self.x, self.y, self.z
@@ -41,18 +242,22 @@ class Point3D(Object3D):
         self.tz = view_matrix[2][0]*x + view_matrix[2][1]*y + view_matrix[2][2]*z + view_matrix[2][3]
 
     def is_visible(self):
-        """Verifica se o ponto está na frente do observador (z negativo)."""
-        return self.tz < 0
+        """Verifica se o ponto está na frente do plano próximo do observador."""
+        return self.tz <= -render_settings.near_plane
 
     def project(self, project_func):
-        self.screen_x, self.screen_y = project_func(self.tx, self.ty, self.tz)
+        if self.buffer is None:
+            tx, ty, tz = self.local['transformed']
+        else:
+            tx, ty, tz = self.buffer.transformed[self.index, :3].tolist()
+        self.screen_x, self.screen_y = project_func(tx, ty, tz)
 
     def draw(self, canvas, clip_region):
         x_min, y_min, x_max, y_max = clip_region
         x, y = self.screen_x, self.screen_y
         # Clipping 2D para pontos
         if x_min <= x <= x_max and y_min <= y <= y_max:
-            canvas.create_oval(x-3, y-3, x+3, y+3, fill=self.color)
+            self.canvas_items.oval(canvas, (x-3, y-3, x+3, y+3), fill=self.color)
 
 class Line3D(Object3D):
     """Classe para representar uma reta (segmento de linha) em 3D."""
@@ -61,27 +266,34 @@ class Line3D(Object3D):
         self.start = start_point  # Ponto inicial (Point3D)
         self.end = end_point      # Ponto final (Point3D)
         self.color = color
+        self.screen = None  # Segmento projetado (x1, y1, x2, y2), recortado pelo plano próximo
+
+    def points(self):
+        return [self.start, self.end]
 
     def transform(self, view_matrix):
         self.start.transform(view_matrix)
         self.end.transform(view_matrix)
 
     def is_visible(self):
-        """Verifica se a linha está na frente do observador."""
-        return self.start.tz < 0 or self.end.tz < 0
+        """Verifica se alguma parte da linha está na frente do plano próximo."""
+        near = render_settings.near_plane
+        return self.start.tz <= -near or self.end.tz <= -near
 
     def project(self, project_func):
-        self.start.project(project_func)
-        self.end.project(project_func)
+        # Recorta a linha pelo plano próximo no espaço da câmera antes de projetar
+        start, end = self.transformed_points()
+        segments = self.project_segments(start, end, project_func).tolist()
+        self.screen = segments[0] if segments else None
 
     def draw(self, canvas, clip_region):
-        x1, y1 = self.start.screen_x, self.start.screen_y
-        x2, y2 = self.end.screen_x, self.end.screen_y
+        if self.screen is None:
+            return
+        x1, y1, x2, y2 = self.screen
         # Aplicar o clipping 2D usando o algoritmo Cohen-Sutherland
         clipped_line = cohen_sutherland_clip(x1, y1, x2, y2, clip_region)
         if clipped_line:
-            x1_clipped, y1_clipped, x2_clipped, y2_clipped = clipped_line
-            canvas.create_line(x1_clipped, y1_clipped, x2_clipped, y2_clipped, fill=self.color)
+            self.canvas_items.line(canvas, clipped_line, fill=self.color)
 
 class Polygon3D(Object3D):
     """Classe para representar um polígono em 3D."""
@@ -90,25 +302,32 @@ class Polygon3D(Object3D):
         self.vertices = vertices  # Lista de objetos Point3D
         self.color = color
         self.fill_color = fill_color  # Pode ser None ou uma string de cor
+        self.screen_points = []  # Vértices projetados, recortados pelo plano próximo
+
+    def points(self):
+        return self.vertices
 
     def transform(self, view_matrix):
         for vertex in self.vertices:
             vertex.transform(view_matrix)
 
     def is_visible(self):
-        """Verifica se o polígono está na frente do observador."""
-        return any(v.tz < 0 for v in self.vertices)
+        """Verifica se alguma parte do polígono está na frente do plano próximo."""
+        return any(v.tz <= -render_settings.near_plane for v in self.vertices)
 
     def project(self, project_func):
-        for vertex in self.vertices:
-            vertex.project(project_func)
+        # Recorta o polígono pelo plano próximo no espaço da câmera antes de projetar
+        vertices = self.transformed_points()
+        clipped, counts = clip_polygons_near(vertices[None], [len(vertices)], render_settings.near_plane)
+        clipped = clipped[0, :counts[0]]
+        x, y = project_func(clipped[:, 0], clipped[:, 1], clipped[:, 2])
+        self.screen_points = list(zip(np.asarray(x).tolist(), np.asarray(y).tolist()))
 
     def draw(self, canvas, clip_region):
-        # Coleta as coordenadas projetadas dos vértices
-        points = []
-        for vertex in self.vertices:
-            x, y = vertex.screen_x, vertex.screen_y
-            points.append((x, y))
+        # Coordenadas projetadas dos vértices (já recortados pelo plano próximo)
+        points = self.screen_points
+        if len(points) < 3:
+            return
 
         # Aplicar o algoritmo de clipping de Sutherland-Hodgman 2D
         clipped_polygon = sutherland_hodgman_clip(points, clip_region)
@@ -116,259 +335,729 @@ class Polygon3D(Object3D):
             # Converte a lista de pontos em uma lista plana de coordenadas
             flat_points = [coord for point in clipped_polygon for coord in point]
             if self.fill_color:
-                canvas.create_polygon(flat_points, fill=self.fill_color, outline=self.color)
+                self.canvas_items.polygon(canvas, flat_points, fill=self.fill_color, outline=self.color)
             else:
                 # Desenha apenas as arestas do polígono sem preenchimento
-                canvas.create_line(flat_points + flat_points[:2], fill=self.color)
-
-class BezierCurve3D(Object3D):
-    """Classe para representar uma curva de Bézier em 3D."""
-    def __init__(self, control_points, color='orange', name=""):
+                self.canvas_items.line(canvas, flat_points + flat_points[:2], fill=self.color)
+
+def point_segment_distance(points, starts, ends):
+    """Distância de cada ponto 2D ao segmento correspondente (arrays (N, 2))."""
+    direction = ends - starts
+    length_squared = (direction ** 2).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = ((points - starts) * direction).sum(axis=1) / length_squared
+    t = np.clip(np.nan_to_num(t), 0, 1)[:, None]
+    return np.sqrt(((starts + t * direction - points) ** 2).sum(axis=1))
+
+class Curve3D(Object3D):
+    """Classe base para curvas paramétricas definidas por pontos de controle.
+
+    A curva é tesselada uniformemente em `steps` segmentos ou, no modo adaptativo,
+    subdividida até que cada corda projetada fique a menos de `tolerance` pixels da
+    curva. Atributos com valor None usam as configurações globais (render_settings).
+    """
+    def __init__(self, control_points, color, name=""):
         super().__init__(name)
         self.control_points = control_points  # Lista de objetos Point3D
-        self.curve_points = []  # Pontos da curva após a avaliação
+        self.curve_segments = np.empty((0, 4))  # Segmentos projetados da curva
         self.color = color
+        self.steps = None  # Número de segmentos da tesselação uniforme
+        self.adaptive = None  # Usa a tesselação adaptativa em espaço de tela
+        self.tolerance = None  # Distância máxima (pixels) entre a corda e a curva
+
+    def points(self):
+        return self.control_points
 
     def transform(self, view_matrix):
         for point in self.control_points:
             point.transform(view_matrix)
 
     def is_visible(self):
-        """Verifica se a curva está na frente do observador."""
-        return any(p.tz < 0 for p in self.control_points)
+        """Verifica se a curva está na frente do plano próximo do observador."""
+        return any(p.tz <= -render_settings.near_plane for p in self.control_points)
+
+    def parameter_range(self):
+        """Intervalo (início, fim) do parâmetro da curva."""
+        return 0.0, 1.0
+
+    def evaluate(self, control, params):
+        """Avalia a curva nos parâmetros dados; por padrão, percorre o polígono de controle (n, 3)."""
+        u_min, u_max = self.parameter_range()
+        knots = np.linspace(u_min, u_max, len(control))
+        return np.column_stack([np.interp(params, knots, control[:, axis]) for axis in range(3)])
+
+    def evaluate_uniform(self, control, steps):
+        """Avalia a curva em steps + 1 parâmetros igualmente espaçados."""
+        u_min, u_max = self.parameter_range()
+        return self.evaluate(control, u_min + (u_max - u_min) * np.arange(steps + 1) / steps)
 
     def project(self, project_func):
-        # Avalia a curva de Bézier e projeta os pontos
-        self.curve_points = []
-        n = len(self.control_points) - 1
-        steps = 100  # Número de segmentos da curva
-        for i in range(steps + 1):
-            t = i / steps
-            x, y, z = self.de_casteljau(t)
-            if z < 0:  # Clipping simples em Z
-                screen_x, screen_y = project_func(x, y, z)
-                self.curve_points.append((screen_x, screen_y))
-
-    def de_casteljau(self, t):
-        """Avalia a curva de Bézier usando o algoritmo de De Casteljau."""
-        points = [(p.tx, p.ty, p.tz) for p in self.control_points]
-        n = len(points)
-        for r in range(1, n):
-            points = [
-                (
-                    (1 - t) * points[i][0] + t * points[i + 1][0],
-                    (1 - t) * points[i][1] + t * points[i + 1][1],
-                    (1 - t) * points[i][2] + t * points[i + 1][2],
-                )
-                for i in range(n - r)
-            ]
-        return points[0]
+        # Avalia a curva e projeta os pontos
+        control = self.transformed_points()
+        adaptive = render_settings.adaptive_curves if self.adaptive is None else self.adaptive
+        if adaptive:
+            tolerance = render_settings.curve_tolerance if self.tolerance is None else self.tolerance
+            curve, _ = self.tessellate_adaptive(control, project_func, tolerance)
+        else:
+            steps = render_settings.curve_steps if self.steps is None else self.steps
+            curve = self.evaluate_uniform(control, steps)
+        # Recorta os segmentos pelo plano próximo antes de projetar
+        self.curve_segments = self.project_segments(curve[:-1], curve[1:], project_func)
+
+    def tessellate_adaptive(self, control, project_func, tolerance):
+        """Subdivide a curva até que cada corda projetada fique a menos de `tolerance` pixels dela."""
+        u_min, u_max = self.parameter_range()
+        segments = max(len(control) - 1, 2)  # Começa com um segmento por vão do polígono de controle
+        params = u_min + (u_max - u_min) * np.arange(segments + 1) / segments
+        curve = self.evaluate(control, params)
+        screen = np.column_stack(project_func(curve[:, 0], curve[:, 1], curve[:, 2]))
+        active = np.ones(segments, dtype=bool)  # Intervalos ainda não testados
+
+        while active.any() and len(params) - 1 < render_settings.max_curve_steps:
+            index = np.flatnonzero(active)
+            middle_params = (params[index] + params[index + 1]) / 2
+            middle = self.evaluate(control, middle_params)
+            middle_screen = np.column_stack(project_func(middle[:, 0], middle[:, 1], middle[:, 2]))
+
+            # Distância entre a curva (no meio do intervalo) e a corda projetada
+            error = point_segment_distance(middle_screen, screen[index], screen[index + 1])
+            flagged = np.flatnonzero(error > tolerance)
+            if not len(flagged):
+                break
+            # Sem espaço para todos no limite de segmentos: subdivide os de maior erro
+            budget = render_settings.max_curve_steps - (len(params) - 1)
+            if len(flagged) > budget:
+                flagged = np.sort(flagged[np.argsort(-error[flagged], kind='stable')[:budget]])
+            split = index[flagged]
+            middle_split = np.searchsorted(index, split)
+            params = np.insert(params, split + 1, middle_params[middle_split])
+            curve = np.insert(curve, split + 1, middle[middle_split], axis=0)
+            screen = np.insert(screen, split + 1, middle_screen[middle_split], axis=0)
+
+            # Só as duas metades dos intervalos subdivididos voltam a ser testadas
+            was_split = np.zeros(len(active), dtype=bool)
+            was_split[split] = True
+            active = np.repeat(was_split, np.where(was_split, 2, 1))
+        return curve, screen
 
     def draw(self, canvas, clip_region):
-        # Desenha a curva conectando os pontos projetados
-        x_min, y_min, x_max, y_max = clip_region
-        for i in range(len(self.curve_points) - 1):
-            x0, y0 = self.curve_points[i]
-            x1, y1 = self.curve_points[i + 1]
-            # Clipping 2D para cada segmento da curva
-            clipped_line = cohen_sutherland_clip(x0, y0, x1, y1, clip_region)
-            if clipped_line:
-                x0_clipped, y0_clipped, x1_clipped, y1_clipped = clipped_line
-                canvas.create_line(x0_clipped, y0_clipped, x1_clipped, y1_clipped, fill=self.color)
-
-class BSplineCurve3D(Object3D):
+        # Desenha a curva pelos segmentos projetados
+        if len(self.curve_segments):
+            # Clipping 2D de todos os segmentos da curva de uma só vez
+            self.draw_segments(canvas, self.curve_segments, clip_region, fill=self.color)
+
+class BezierCurve3D(Curve3D):
+    """Classe para representar uma curva de Bézier em 3D."""
+    def __init__(self, control_points, color='orange', name=""):
+        super().__init__(control_points, color, name)
+
+    def evaluate(self, control, params):
+        return bernstein_matrix(len(control) - 1, params) @ control
+
+    def evaluate_uniform(self, control, steps):
+        # Todas as amostras de uma vez: matriz de Bernstein (em cache) @ pontos de controle
+        return bernstein_basis(len(control) - 1, steps) @ control
+
+class BSplineCurve3D(Curve3D):
     """Classe para representar uma curva B-spline em 3D."""
     def __init__(self, control_points, degree=3, color='brown', name=""):
-        super().__init__(name)
-        self.control_points = control_points  # Lista de objetos Point3D
+        super().__init__(control_points, color, name)
         self.degree = degree
-        self.color = color
         self.knots = []
-        self.curve_points = []
 
     def generate_knot_vector(self):
-        n = len(self.control_points)
-        k = self.degree
-        # Usando uma sequência uniforme de knots
-        self.knots = [0] * k + list(range(1, n - k + 1)) + [n - k + 1] * k
+        # Usando uma sequência uniforme de knots (em cache por grau e número de pontos)
+        self.knots = uniform_knot_vector(self.degree, len(self.control_points))
+
+    def parameter_range(self):
+        self.generate_knot_vector()
+        return self.knots[self.degree], self.knots[-self.degree - 1]
+
+    def evaluate(self, control, params):
+        # Pesos das funções de base para todos os parâmetros (recorrência de De Boor)
+        spans, weights = bspline_weights(self.knots, self.degree, params)
+        indices = spans[:, None] - self.degree + np.arange(self.degree + 1)
+        return bspline_evaluate(indices, weights, control)
+
+    def evaluate_uniform(self, control, steps):
+        # Knots, intervalos e pesos ficam em cache por (grau, pontos de controle, amostras)
+        indices, weights = bspline_basis(self.degree, len(control), steps)
+        return bspline_evaluate(indices, weights, control)
+
+def face_normals(vertices, faces, sizes):
+    """Normais (não normalizadas) das faces pelo método de Newell, array (F, 3).
+
+    Com os vértices em sentido anti-horário vistos de fora, a normal aponta para fora.
+    """
+    columns = np.arange(faces.shape[1])
+    valid = columns < sizes[:, None]
+    # Índice do vértice seguinte de cada face, voltando ao primeiro no fim
+    following = faces[np.arange(len(faces))[:, None], (columns + 1) % np.maximum(sizes, 1)[:, None]]
+    current = vertices[faces]
+    following = vertices[following]
+    return (np.cross(current, following) * valid[..., None]).sum(axis=1)
+
+def is_closed_mesh(faces, sizes):
+    """Verifica se as faces formam uma superfície fechada com orientação consistente.
+
+    Isso vale quando cada aresta orientada (a, b) aparece uma única vez e a aresta
+    oposta (b, a) também pertence à malha.
+    """
+    if not len(faces):
+        return False
+    columns = np.arange(faces.shape[1])
+    valid = columns < sizes[:, None]
+    following = faces[np.arange(len(faces))[:, None], (columns + 1) % np.maximum(sizes, 1)[:, None]]
+    starts, ends = faces[valid], following[valid]
+    count = int(faces.max()) + 1
+    edges = np.sort(starts * count + ends)
+    reverse = np.sort(ends * count + starts)
+    return bool(np.all(edges[1:] != edges[:-1]) and np.array_equal(edges, reverse))
+
+def pad_faces(faces):
+    """Converte uma lista de faces (listas de índices) em um array (F, K) preenchido com -1."""
+    if isinstance(faces, np.ndarray):
+        return faces.astype(np.int64, copy=False)
+    width = max((len(face) for face in faces), default=0)
+    padded = np.full((len(faces), width), -1, dtype=np.int64)
+    for i, face in enumerate(faces):
+        padded[i, :len(face)] = face
+    return padded
+
+def write_mesh_storage(directory, vertices, faces, lines, chunk=1 << 20):
+    """Grava os vértices (homogêneos) e os índices de uma malha em arquivos .npy.
+
+    Os vértices são copiados em blocos de `chunk` linhas, então a origem pode ser
+    outro array mapeado (como o cache de um OBJ) sem ser carregada inteira. A caixa
+    envolvente, o centróide e a indicação de sólido fechado vão para meta.json,
+    gravado por último: ao reabrir a malha, nada disso exige ler os vértices.
+    """
+    os.makedirs(directory, exist_ok=True)
+    vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+    stored = np.lib.format.open_memmap(os.path.join(directory, 'vertices.npy'), mode='w+',
+                                       dtype=float, shape=(len(vertices), 4))
+    low, high, total = np.full(3, np.inf), np.full(3, -np.inf), np.zeros(3)
+    for start in range(0, len(vertices), chunk):
+        block = np.asarray(vertices[start:start + chunk])
+        stored[start:start + chunk, :3] = block
+        stored[start:start + chunk, 3] = 1
+        low, high = np.minimum(low, block.min(axis=0)), np.maximum(high, block.max(axis=0))
+        total += block.sum(axis=0)
+    stored.flush()
+    del stored
+    faces = pad_faces(faces)
+    sizes = (faces >= 0).sum(axis=1)
+    np.save(os.path.join(directory, 'faces.npy'), faces)
+    np.save(os.path.join(directory, 'face_sizes.npy'), sizes)
+    np.save(os.path.join(directory, 'lines.npy'), np.asarray(lines, dtype=np.int64).reshape(-1, 2))
+    meta = {'closed': is_closed_mesh(faces, sizes), 'count': len(vertices)}
+    if len(vertices):
+        meta.update(low=low.tolist(), high=high.tolist(), centroid=(total / len(vertices)).tolist())
+    with open(os.path.join(directory, 'meta.json'), 'w') as meta_file:
+        json.dump(meta, meta_file)
+
+def open_mesh_storage(directory):
+    """Abre (somente leitura, com np.memmap) os arrays gravados por write_mesh_storage.
+
+    Retorna (vertices, faces, face_sizes, lines, meta).
+    """
+    def load(name):
+        return np.load(os.path.join(directory, name + '.npy'), mmap_mode='r')
+    with open(os.path.join(directory, 'meta.json'), 'r') as meta_file:
+        meta = json.load(meta_file)
+    return load('vertices'), load('faces'), load('face_sizes'), load('lines'), meta
+
+def project_indexed(transformed, faces, sizes, lines, project_func):
+    """Projeta as faces e linhas de uma malha indexada, recortando-as pelo plano próximo.
+
+    transformed: vértices (N, 3) no espaço da câmera. Retorna (screen, polygons,
+    polygon_sizes, segments): os vértices projetados, as faces projetadas (P, K, 2)
+    com o número de vértices válidos de cada uma e os segmentos (S, 4).
+    """
+    # Cada vértice é projetado uma única vez, independente de quantas faces o usam
+    x, y = project_func(transformed[:, 0], transformed[:, 1], transformed[:, 2])
+    screen = np.column_stack((x, y))
+    near = render_settings.near_plane
+    behind = transformed[:, 2] > -near  # Vértices atrás do plano próximo
+
+    polygons = screen[faces]
+    crossing = (behind[faces] & (faces >= 0)).any(axis=1)
+    if crossing.any():
+        # Faces com vértices atrás do plano próximo são recortadas no espaço da
+        # câmera e os vértices resultantes projetados de novo
+        clipped, counts = clip_polygons_near(transformed[faces[crossing]], sizes[crossing], near)
+        clipped_x, clipped_y = project_func(clipped[..., 0], clipped[..., 1], clipped[..., 2])
+        width = max(faces.shape[1], clipped.shape[1])
+        polygons = np.concatenate((polygons, np.zeros((len(faces), width - faces.shape[1], 2))), axis=1)
+        polygons[crossing] = 0
+        polygons[crossing, :clipped.shape[1]] = np.stack((clipped_x, clipped_y), axis=-1)
+        sizes = sizes.copy()
+        sizes[crossing] = counts
+        polygons, sizes = polygons[sizes > 0], sizes[sizes > 0]
+
+    if behind[lines].any():
+        segments = project_segments_near(transformed[lines[:, 0]], transformed[lines[:, 1]], project_func)
+    else:
+        segments = np.hstack((screen[lines[:, 0]], screen[lines[:, 1]]))
+    return screen, polygons, sizes, segments
+
+class Mesh3D(Object3D):
+    """Classe para representar uma malha indexada em 3D.
+
+    Os vértices ficam em um único array e as faces guardam apenas índices para
+    ele, de modo que vértices compartilhados por várias faces são transformados e
+    projetados uma única vez por quadro.
+    """
+    def __init__(self, vertices, faces=(), lines=(), color='purple', fill_color=None, name=""):
+        """
+        vertices: sequência de coordenadas (x, y, z)
+        faces: lista de faces (listas de índices) ou array (F, K) preenchido com -1
+        lines: lista de segmentos (pares de índices)
+        """
+        super().__init__(name)
+        self.color = color
+        self.fill_color = fill_color  # Pode ser None ou uma string de cor
+        self.faces = pad_faces(faces)  # Índices dos vértices de cada face (-1 = vazio)
+        self.face_sizes = (self.faces >= 0).sum(axis=1)  # Número de vértices de cada face
+        self.lines = np.asarray(lines, dtype=np.int64).reshape(-1, 2)  # Segmentos (pares de índices)
+        self.closed = is_closed_mesh(self.faces, self.face_sizes)  # Sólido fechado (permite backface culling)
+        self.front_faces = None  # Máscara das faces voltadas para o observador (None = todas)
+        # Armazenamento local enquanto a malha não pertence a um VertexBuffer
+        vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+        self.local_vertices = np.ones((len(vertices), 4))
+        self.local_vertices[:, :3] = vertices
+        self.local_transformed = self.local_vertices.copy()
+        self.screen = np.zeros((len(vertices), 2))  # Coordenadas projetadas
+        self.polygons = np.empty((0, 0, 2))  # Faces projetadas, recortadas pelo plano próximo
+        self.polygon_sizes = np.empty(0, dtype=np.int64)  # Vértices válidos de cada face projetada
+        self.segments = np.empty((0, 4))  # Linhas projetadas, recortadas pelo plano próximo
+        # Dados em cache compartilhados com as instâncias (MeshInstance3D) da malha
+        self.centroid = None
+        self.normals = None
+        self.instance_scratch = None  # Vértices transformados da última instância processada
+        self.instance_owner = None
+
+    @property
+    def vertices(self):
+        """Coordenadas originais (homogêneas) dos vértices, array (N, 4)."""
+        if self.buffer is None:
+            return self.local_vertices
+        start, end = self.vertex_range
+        return self.buffer.vertices[start:end]
+
+    @property
+    def transformed(self):
+        """Coordenadas transformadas dos vértices, array (N, 4)."""
+        if self.buffer is None:
+            return self.local_transformed
+        start, end = self.vertex_range
+        return self.buffer.transformed[start:end]
+
+    def attach(self, buffer):
+        start = buffer.allocate(len(self.local_vertices))
+        end = start + len(self.local_vertices)
+        buffer.vertices[start:end] = self.local_vertices
+        buffer.transformed[start:end] = self.local_transformed
+        self.buffer = buffer
+        self.vertex_range = (start, end)
+        self.contiguous = True
+        self.local_vertices = self.local_transformed = None
+
+    def local_points(self):
+        return self.vertices[:, :3]
+
+    def local_centroid(self):
+        """Centróide dos vértices no espaço do objeto, em cache."""
+        if self.centroid is None:
+            self.centroid = self.local_points().mean(axis=0)
+        return self.centroid
+
+    def local_face_normals(self):
+        """Normais das faces no espaço do objeto, em cache (usadas pelas instâncias)."""
+        if self.normals is None:
+            self.normals = face_normals(self.local_points(), self.faces, self.face_sizes)
+        return self.normals
+
+    def instance_transformed(self, instance, matrix):
+        """Vértices transformados pela matriz de uma instância (array de trabalho compartilhado).
+
+        O produto só é refeito quando outra instância usou o array desde a última vez.
+        """
+        if self.instance_owner is not instance:
+            if self.instance_scratch is None:
+                self.instance_scratch = np.empty(self.vertices.shape)
+            np.matmul(self.vertices, matrix.T, out=self.instance_scratch)
+            self.instance_owner = instance
+        return self.instance_scratch
+
+    def depth(self):
+        transformed = self.transformed[:, :3]
+        if not len(transformed):
+            return 0.0
+        return float(np.sqrt((transformed.mean(axis=0) ** 2).sum()))
 
     def transform(self, view_matrix):
-        for point in self.control_points:
-            point.transform(view_matrix)
+        np.matmul(self.vertices, np.asarray(view_matrix, dtype=float).T, out=self.transformed)
 
     def is_visible(self):
-        """Verifica se a curva está na frente do observador."""
-        return any(p.tz < 0 for p in self.control_points)
+        """Verifica se alguma parte da malha está na frente do plano próximo."""
+        return bool((self.transformed[:, 2] <= -render_settings.near_plane).any())
+
+    def cull(self, eye, view_matrix):
+        """Marca as faces voltadas para o observador usando as normais no espaço da câmera."""
+        self.front_faces = None
+        if not (render_settings.backface_culling and self.closed):
+            return
+        transformed = self.transformed[:, :3]
+        normals = face_normals(transformed, self.faces, self.face_sizes)
+        self.front_faces = self.facing_eye(normals, transformed[self.faces[:, 0]], eye, self.model_view(view_matrix))
+
+    def facing_eye(self, normals, corners, eye, model_view):
+        """Máscara das faces cujas normais (no espaço da câmera) apontam para o observador.
+
+        Uma matriz com determinante negativo (espelhamento, como uma escala por -1)
+        inverte o sentido dos vértices de cada face e, com ele, o das normais de
+        Newell: nesse caso a comparação é invertida. corners: um vértice de cada face.
+        """
+        # Direção de cada face até o observador (constante se ele está no infinito)
+        to_eye = np.asarray(eye[:3], dtype=float) - eye[3] * corners
+        facing = (normals * to_eye).sum(axis=1)
+        if np.linalg.det(np.asarray(model_view, dtype=float)[:3, :3]) < 0:
+            return facing < 0
+        return facing > 0
 
     def project(self, project_func):
-        # Avalia a curva B-spline e projeta os pontos
-        self.curve_points = []
-        self.generate_knot_vector()
-        n = len(self.control_points) - 1
-        steps = 100  # Número de segmentos da curva
-        u_min = self.knots[self.degree]
-        u_max = self.knots[-self.degree - 1]
-        for i in range(steps + 1):
-            u = u_min + (u_max - u_min) * i / steps
-            x, y, z = self.de_boor(u)
-            if z < 0:  # Clipping simples em Z
-                screen_x, screen_y = project_func(x, y, z)
-                self.curve_points.append((screen_x, screen_y))
-
-    def de_boor(self, u):
-        """Avalia a curva B-spline usando o algoritmo de De Boor."""
-        k = self.degree
-        knots = self.knots
-        points = [(p.tx, p.ty, p.tz) for p in self.control_points]
-        n = len(points) - 1
-
-        # Encontra o intervalo de knots
-        for i in range(len(knots) - 1):
-            if knots[i] <= u < knots[i + 1]:
-                break
+        faces, sizes = self.faces, self.face_sizes
+        if self.front_faces is not None:
+            # Faces de trás de um sólido fechado não são recortadas nem desenhadas
+            faces, sizes = faces[self.front_faces], sizes[self.front_faces]
+        self.screen, self.polygons, self.polygon_sizes, self.segments = project_indexed(
+            self.transformed[:, :3], faces, sizes, self.lines, project_func)
+
+    def draw(self, canvas, clip_region):
+        if len(self.polygons):
+            # Clipping 2D de todas as faces de uma só vez (Sutherland-Hodgman em lote)
+            self.draw_polygons(canvas, self.polygons, clip_region, self.polygon_sizes, self.fill_color, self.color)
+        if len(self.segments):
+            # Clipping 2D de todos os segmentos da malha de uma só vez
+            self.draw_segments(canvas, self.segments, clip_region, fill=self.color)
+
+class MeshInstance3D(Mesh3D):
+    """Instância de uma malha compartilhada, posicionada pela sua matriz de modelo."""
+    def __init__(self, mesh, model_matrix=None, color=None, fill_color=None, name=""):
+        Object3D.__init__(self, name)
+        self.mesh = mesh  # Malha compartilhada (não precisa estar na cena)
+        self.model_matrix = None if model_matrix is None else np.asarray(model_matrix, dtype=float)
+        self.color = mesh.color if color is None else color
+        self.fill_color = mesh.fill_color if fill_color is None else fill_color
+        self.front_faces = None
+        self.model_view_matrix = None  # Matriz visualização · modelo do último quadro
+        self.screen = np.zeros((0, 2))
+        self.polygons = np.empty((0, 0, 2))
+        self.polygon_sizes = np.empty(0, dtype=np.int64)
+        self.segments = np.empty((0, 4))
+
+    @property
+    def faces(self):
+        return self.mesh.faces
+
+    @property
+    def face_sizes(self):
+        return self.mesh.face_sizes
+
+    @property
+    def lines(self):
+        return self.mesh.lines
+
+    @property
+    def closed(self):
+        return self.mesh.closed
+
+    @property
+    def vertices(self):
+        return self.mesh.vertices
+
+    @property
+    def transformed(self):
+        """Vértices no espaço da câmera, calculados no array de trabalho da malha."""
+        return self.mesh.instance_transformed(self, self.model_view_matrix)
+
+    def attach(self, buffer):
+        pass  # Os vértices continuam na malha compartilhada
+
+    def local_box(self):
+        return self.mesh.local_box()
+
+    def transform(self, view_matrix):
+        # Só guarda a matriz: o produto é feito quando a instância for desenhada
+        self.model_view_matrix = np.asarray(view_matrix, dtype=float)
+        self.mesh.instance_owner = None
+
+    def depth(self):
+        # O centróide transformado é o centróide da malha levado pela matriz
+        if self.model_view_matrix is None or not len(self.vertices):
+            return 0.0
+        center = self.model_view_matrix @ np.append(self.mesh.local_centroid(), 1.0)
+        return float(np.sqrt((center[:3] ** 2).sum()))
+
+    def cull(self, eye, view_matrix):
+        """Como Mesh3D.cull, mas com as normais da malha em cache levadas pela matriz."""
+        self.front_faces = None
+        if not (render_settings.backface_culling and self.closed):
+            return
+        transformed = self.transformed[:, :3]
+        # A matriz de cofatores dá as mesmas normais de Newell que os vértices
+        # transformados dariam, inclusive a inversão por espelhamentos; suas colunas
+        # são produtos vetoriais das colunas de A, então existe mesmo com escala 0
+        c0, c1, c2 = self.model_view_matrix[:3, :3].T
+        cofactors = np.column_stack((np.cross(c1, c2), np.cross(c2, c0), np.cross(c0, c1)))
+        normals = self.mesh.local_face_normals() @ cofactors.T
+        self.front_faces = self.facing_eye(normals, transformed[self.faces[:, 0]], eye, self.model_view_matrix)
+
+class MappedMesh3D(Mesh3D):
+    """Malha indexada cujos vértices e índices ficam em arquivos mapeados com np.memmap."""
+    def __init__(self, storage, vertices=None, faces=(), lines=(), color='purple', fill_color=None, name="",
+                 chunk_faces=1 << 16):
+        """
+        storage: diretório dos arquivos da malha
+        vertices, faces, lines: como em Mesh3D; com vertices = None, abre os arquivos já gravados
+        chunk_faces: número de faces (ou linhas) processadas por bloco no desenho
+        """
+        Object3D.__init__(self, name)
+        self.color = color
+        self.fill_color = fill_color
+        self.storage = storage
+        self.chunk_faces = chunk_faces
+        if vertices is not None:
+            write_mesh_storage(storage, vertices, faces, lines)
+        self.local_vertices, self.faces, self.face_sizes, self.lines, meta = open_mesh_storage(storage)
+        self.local_transformed = None
+        self.closed = meta['closed']
+        if 'low' in meta:
+            self.local_bounds = (np.array(meta['low']), np.array(meta['high']))
+            self.centroid = np.array(meta['centroid'])
         else:
-            i = n
+            self.local_bounds = ()
+            self.centroid = np.zeros(3)
+        self.normals = None
+        self.instance_scratch = None
+        self.instance_owner = None
+        self.front_faces = None
+        self.model_view_matrix = None  # Matriz visualização · modelo do quadro
+        self.eye = None  # Observador do quadro (para o descarte das faces de trás)
+        self.project_func = None  # Projeção do quadro, aplicada bloco a bloco no desenho
+        self.screen = np.zeros((0, 2))
+        self.polygons = np.empty((0, 0, 2))
+        self.polygon_sizes = np.empty(0, dtype=np.int64)
+        self.segments = np.empty((0, 4))
+
+    @property
+    def transformed(self):
+        """Todos os vértices transformados (aloca o array inteiro; usado na exportação)."""
+        return np.asarray(self.vertices) @ self.model_view_matrix.T
+
+    def attach(self, buffer):
+        pass  # Os vértices mapeados não são copiados para o buffer da cena
 
-        d = [list(p) for p in points[i - k:i + 1]]
+    def transform(self, view_matrix):
+        # Só guarda a matriz: os vértices são transformados bloco a bloco no desenho
+        self.model_view_matrix = np.asarray(view_matrix, dtype=float)
+
+    def depth(self):
+        if self.model_view_matrix is None or not self.local_bounds:
+            return 0.0
+        center = self.model_view_matrix @ np.append(self.centroid, 1.0)
+        return float(np.sqrt((center[:3] ** 2).sum()))
 
-        for r in range(1, k + 1):
-            for j in range(k, r - 1, -1):
-                denom = knots[i + j - r + 1] - knots[i - k + j]
-                if denom == 0:
-                    alpha = 0
-                else:
-                    alpha = (u - knots[i - k + j]) / denom
-                d[j][0] = (1 - alpha) * d[j - 1][0] + alpha * d[j][0]
-                d[j][1] = (1 - alpha) * d[j - 1][1] + alpha * d[j][1]
-                d[j][2] = (1 - alpha) * d[j - 1][2] + alpha * d[j][2]
+    def is_visible(self):
+        """Verifica, pelos cantos da caixa envolvente, se a malha pode estar na frente do plano próximo."""
+        if not self.local_bounds:
+            return False
+        low, high = self.local_bounds
+        corners = np.array([(x, y, z, 1.0) for x in (low[0], high[0]) for y in (low[1], high[1]) for z in (low[2], high[2])])
+        return bool(((corners @ self.model_view_matrix.T)[:, 2] <= -render_settings.near_plane).any())
 
-        return d[k]
+    def cull(self, eye, view_matrix):
+        self.eye = eye if render_settings.backface_culling and self.closed else None
+
+    def project(self, project_func):
+        self.project_func = project_func
+
+    def chunk(self, indices):
+        """Vértices (no espaço da câmera) usados por um bloco de índices e os índices renumerados."""
+        indices = np.asarray(indices)
+        valid = indices >= 0
+        used = np.unique(indices[valid])
+        local = np.full(indices.shape, -1, dtype=np.int64)
+        local[valid] = np.searchsorted(used, indices[valid])
+        transformed = np.asarray(self.vertices[used]) @ self.model_view_matrix.T
+        return transformed[:, :3], local
 
     def draw(self, canvas, clip_region):
-        # Desenha a curva conectando os pontos projetados
-        x_min, y_min, x_max, y_max = clip_region
-        for i in range(len(self.curve_points) - 1):
-            x0, y0 = self.curve_points[i]
-            x1, y1 = self.curve_points[i + 1]
-            # Clipping 2D para cada segmento da curva
-            clipped_line = cohen_sutherland_clip(x0, y0, x1, y1, clip_region)
-            if clipped_line:
-                x0_clipped, y0_clipped, x1_clipped, y1_clipped = clipped_line
-                canvas.create_line(x0_clipped, y0_clipped, x1_clipped, y1_clipped, fill=self.color)
-
-class Cone3D(Object3D):
-    """Classe para representar um cone em 3D."""
+        no_lines = np.empty((0, 2), dtype=np.int64)
+        no_faces, no_sizes = np.empty((0, 0), dtype=np.int64), np.empty(0, dtype=np.int64)
+        for start in range(0, len(self.faces), self.chunk_faces):
+            transformed, faces = self.chunk(self.faces[start:start + self.chunk_faces])
+            sizes = np.asarray(self.face_sizes[start:start + self.chunk_faces])
+            if self.eye is not None:
+                # Faces de trás de um sólido fechado não são recortadas nem desenhadas
+                normals = face_normals(transformed, faces, sizes)
+                front = self.facing_eye(normals, transformed[faces[:, 0]], self.eye, self.model_view_matrix)
+                faces, sizes = faces[front], sizes[front]
+            _, polygons, sizes, _ = project_indexed(transformed, faces, sizes, no_lines, self.project_func)
+            if len(polygons):
+                self.draw_polygons(canvas, polygons, clip_region, sizes, self.fill_color, self.color)
+        for start in range(0, len(self.lines), self.chunk_faces):
+            transformed, lines = self.chunk(self.lines[start:start + self.chunk_faces])
+            _, _, _, segments = project_indexed(transformed, no_faces, no_sizes, lines, self.project_func)
+            if len(segments):
+                self.draw_segments(canvas, segments, clip_region, fill=self.color)
+
+class Cone3D(Mesh3D):
+    """Classe para representar um cone em 3D como uma malha indexada."""
     def __init__(self, base_center, height, radius, segments=20, color='magenta', fill_color='pink', name=""):
-        super().__init__(name)
-        self.base_center = base_center  # Point3D
         self.height = height
         self.radius = radius
         self.segments = segments
-        self.color = color
-        self.fill_color = fill_color
 
-        # Vértice do topo do cone
-        self.apex = Point3D(base_center.x, base_center.y + height, base_center.z)
+        # Vértice 0: topo do cone
+        vertices = [(base_center.x, base_center.y + height, base_center.z)]
 
-        # Gera os pontos da base
+        # Vértices 1..segments: pontos da base
         angle_increment = 2 * math.pi / segments
-        self.base_vertices = []
         for i in range(segments):
             angle = i * angle_increment
             x = base_center.x + radius * math.cos(angle)
             z = base_center.z + radius * math.sin(angle)
             y = base_center.y
-            self.base_vertices.append(Point3D(x, y, z))
+            vertices.append((x, y, z))
 
-        # Cria as faces do cone (como triângulos)
-        self.faces = []
+        # Faces laterais (triângulos) com normais voltadas para fora, e a base
+        faces = []
         for i in range(segments):
             next_i = (i + 1) % segments
-            triangle = [self.apex, self.base_vertices[i], self.base_vertices[next_i]]
-            self.faces.append(Polygon3D(triangle, color=self.color, fill_color=self.fill_color))
+            faces.append([0, next_i + 1, i + 1])
+        faces.append(list(range(1, segments + 1)))
 
-        # Base do cone
-        self.base_face = Polygon3D(self.base_vertices, color=self.color, fill_color=self.fill_color)
+        super().__init__(vertices, faces, color=color, fill_color=fill_color, name=name)
 
-    def transform(self, view_matrix):
-        self.apex.transform(view_matrix)
-        self.base_center.transform(view_matrix)
-        for vertex in self.base_vertices:
-            vertex.transform(view_matrix)
-        self.base_face.transform(view_matrix)
-        for face in self.faces:
-            face.transform(view_matrix)
-
-    def is_visible(self):
-        """Verifica se o cone está na frente do observador."""
-        return self.apex.tz < 0 or any(v.tz < 0 for v in self.base_vertices)
-
-    def project(self, project_func):
-        self.apex.project(project_func)
-        self.base_center.project(project_func)
-        for vertex in self.base_vertices:
-            vertex.project(project_func)
-        self.base_face.project(project_func)
-        for face in self.faces:
-            face.project(project_func)
-
-    def draw(self, canvas, clip_region):
-        # Desenha as faces laterais
-        for face in self.faces:
-            face.draw(canvas, clip_region)
-        # Desenha a base
-        self.base_face.draw(canvas, clip_region)
-
-class Cube3D(Object3D):
-    """Classe para representar um cubo em 3D."""
+class Cube3D(Mesh3D):
+    """Classe para representar um cubo em 3D como uma malha indexada."""
     def __init__(self, center, size, color='blue', name=""):
-        super().__init__(name)
         self.size = size
         d = size / 2
         x, y, z = center.x, center.y, center.z
-        self.color = color
         # Define os 8 vértices do cubo
-        self.vertices = [
-            Point3D(x - d, y - d, z - d),
-            Point3D(x - d, y - d, z + d),
-            Point3D(x - d, y + d, z - d),
-            Point3D(x - d, y + d, z + d),
-            Point3D(x + d, y - d, z - d),
-            Point3D(x + d, y - d, z + d),
-            Point3D(x + d, y + d, z - d),
-            Point3D(x + d, y + d, z + d),
+        vertices = [
+            (x - d, y - d, z - d),
+            (x - d, y - d, z + d),
+            (x - d, y + d, z - d),
+            (x - d, y + d, z + d),
+            (x + d, y - d, z - d),
+            (x + d, y - d, z + d),
+            (x + d, y + d, z - d),
+            (x + d, y + d, z + d),
         ]
-        # Define as faces do cubo (como polígonos)
-        self.faces = [
-            Polygon3D([self.vertices[0], self.vertices[1], self.vertices[3], self.vertices[2]], color=self.color),
-            Polygon3D([self.vertices[4], self.vertices[5], self.vertices[7], self.vertices[6]], color=self.color),
-            Polygon3D([self.vertices[0], self.vertices[1], self.vertices[5], self.vertices[4]], color=self.color),
-            Polygon3D([self.vertices[2], self.vertices[3], self.vertices[7], self.vertices[6]], color=self.color),
-            Polygon3D([self.vertices[0], self.vertices[2], self.vertices[6], self.vertices[4]], color=self.color),
-            Polygon3D([self.vertices[1], self.vertices[3], self.vertices[7], self.vertices[5]], color=self.color),
+        # Define as faces do cubo (índices em sentido anti-horário vistos de fora)
+        faces = [
+            [0, 1, 3, 2],
+            [4, 6, 7, 5],
+            [0, 4, 5, 1],
+            [2, 3, 7, 6],
+            [0, 2, 6, 4],
+            [1, 5, 7, 3],
         ]
+        super().__init__(vertices, faces, color=color, name=name)
+
+class Surface3D(Object3D):
+    """Classe base para superfícies definidas por uma matriz de pontos de controle."""
+    def __init__(self, control_points_matrix, color, wireframe, name=""):
+        super().__init__(name)
+        self.control_points = control_points_matrix  # Matriz de pontos de controle (Point3D)
+        self.color = color
+        self.wireframe = wireframe
+        self.surface_points = np.empty((0, 0, 2))  # Grade de pontos projetados
+        self.surface_visible = np.empty((0, 0), dtype=bool)  # Amostras na frente do plano próximo
+        self.steps = None  # Número de divisões nas direções u e v (None = LOD automático)
+        self.lod = None  # Divisões (u, v) usadas no último quadro
+
+    def points(self):
+        return [point for row in self.control_points for point in row]
 
     def transform(self, view_matrix):
-        for vertex in self.vertices:
-            vertex.transform(view_matrix)
-        for face in self.faces:
-            face.transform(view_matrix)
+        for row in self.control_points:
+            for point in row:
+                point.transform(view_matrix)
 
     def is_visible(self):
-        """Verifica se o cubo está na frente do observador."""
-        return any(v.tz < 0 for v in self.vertices)
+        """Verifica se a superfície está na frente do plano próximo do observador."""
+        near = render_settings.near_plane
+        return any(point.tz <= -near for row in self.control_points for point in row)
 
-    def project(self, project_func):
-        for vertex in self.vertices:
-            vertex.project(project_func)
-        for face in self.faces:
-            face.project(project_func)
+    def control_net(self):
+        """Pontos de controle transformados como um array (linhas, colunas, 3)."""
+        rows, columns = len(self.control_points), len(self.control_points[0])
+        return self.transformed_points().reshape(rows, columns, 3)
+
+    def screen_size(self, net, project_func):
+        """Maior lado (pixels) da caixa envolvente da malha de controle projetada.
+
+        Retorna None se a caixa alcança o plano do observador (superfície muito próxima).
+        """
+        low, high = net.reshape(-1, 3).min(axis=0), net.reshape(-1, 3).max(axis=0)
+        if high[2] >= 0:
+            return None
+        # Os 8 cantos da caixa envolvente no espaço da câmera
+        corners = np.array([(x, y, z) for x in (low[0], high[0]) for y in (low[1], high[1]) for z in (low[2], high[2])])
+        x, y = project_func(corners[:, 0], corners[:, 1], corners[:, 2])
+        return max(np.ptp(x), np.ptp(y))
+
+    def lod_steps(self, net, project_func, patches=(1, 1)):
+        """Divisões (u, v) por trecho: fixas em self.steps ou escolhidas pelo tamanho na tela."""
+        if self.steps is not None:
+            self.lod = (self.steps, self.steps)
+            return self.lod
+        settings = render_settings
+        size = self.screen_size(net, project_func)
+        lod = []
+        for count in patches:
+            if size is None:
+                steps = settings.surface_max_steps
+            else:
+                # Potência de dois mais próxima de uma divisão a cada surface_lod_pixels
+                segments = max(size / count / settings.surface_lod_pixels, 1)
+                steps = 2 ** round(math.log2(segments))
+            lod.append(int(min(max(steps, settings.surface_min_steps), settings.surface_max_steps)))
+        self.lod = tuple(lod)
+        return self.lod
+
+    def project_grid(self, grid, project_func):
+        """Projeta uma grade (U, V, 3) de pontos da superfície de uma só vez."""
+        self.surface_visible = grid[..., 2] <= -render_settings.near_plane  # Amostras na frente do plano próximo
+        x, y = project_func(grid[..., 0], grid[..., 1], grid[..., 2])
+        self.surface_points = np.stack((x, y), axis=-1)
 
     def draw(self, canvas, clip_region):
-        for face in self.faces:
-            face.draw(canvas, clip_region)
+        # Desenha a superfície como uma malha de linhas ou polígonos
+        points = self.surface_points
+        visible = self.surface_visible
+        if points.shape[0] < 2 or points.shape[1] < 2:
+            return
+        # Cantos de cada quadrilátero da grade: (i, j), (i, j + 1), (i + 1, j + 1), (i + 1, j)
+        quads = np.stack((points[:-1, :-1], points[:-1, 1:], points[1:, 1:], points[1:, :-1]), axis=2)
+        # Só os quadriláteros com os quatro cantos visíveis
+        quads = quads[visible[:-1, :-1] & visible[:-1, 1:] & visible[1:, 1:] & visible[1:, :-1]]
+        if not len(quads):
+            return
+        if self.wireframe:
+            # Arestas de cada quadrilátero, recortadas em lote
+            segments = np.concatenate((quads, np.roll(quads, -1, axis=1)), axis=2).reshape(-1, 4)
+            self.draw_segments(canvas, segments, clip_region, fill=self.color)
+        else:
+            # Quadriláteros preenchidos, recortados em lote
+            self.draw_polygons(canvas, quads, clip_region, fill_color=self.color)
 
-class BezierSurface3D(Object3D):
+class BezierSurface3D(Surface3D):
     """Classe para representar uma superfície bicúbica de Bézier em 3D."""
     def __init__(self, control_points_matrix, color='cyan', wireframe=True, name=""):
         """
@@ -376,37 +1065,19 @@ class BezierSurface3D(Object3D):
         color: cor da superfície
         wireframe: se True, desenha a malha; se False, preenche os polígonos
         """
-        super().__init__(name)
-        self.control_points = control_points_matrix  # Matriz 4x4 de pontos de controle
-        self.color = color
-        self.wireframe = wireframe
-        self.surface_points = []  # Pontos avaliados na superfície
-
-    def transform(self, view_matrix):
-        for row in self.control_points:
-            for point in row:
-                point.transform(view_matrix)
-
-    def is_visible(self):
-        """Verifica se a superfície está na frente do observador."""
-        return any(point.tz < 0 for row in self.control_points for point in row)
+        super().__init__(control_points_matrix, color, wireframe, name)
 
     def project(self, project_func):
-        # Avalia a superfície de Bézier e projeta os pontos
-        self.surface_points = []
-        steps = 10  # Número de divisões na superfície
-        for i in range(steps + 1):
-            u = i / steps
-            row = []
-            for j in range(steps + 1):
-                v = j / steps
-                x, y, z = self.de_casteljau_surface(u, v)
-                if z < 0:  # Clipping simples em Z
-                    screen_x, screen_y = project_func(x, y, z)
-                    row.append((screen_x, screen_y))
-                else:
-                    row.append(None)
-            self.surface_points.append(row)
+        # Avalia a superfície de Bézier como Bu · P · Bvᵀ (uma coordenada por vez),
+        # com as matrizes de Bernstein em cache
+        net = self.control_net()
+        rows, columns = net.shape[:2]
+        # u percorre as colunas da matriz de controle e v percorre as linhas
+        steps_u, steps_v = self.lod_steps(net, project_func)
+        basis_u = bernstein_basis(columns - 1, steps_u)
+        basis_v = bernstein_basis(rows - 1, steps_v)
+        grid = np.stack([basis_u @ net[:, :, c].T @ basis_v.T for c in range(3)], axis=-1)
+        self.project_grid(grid, project_func)
 
     def de_casteljau_surface(self, u, v):
         """Avalia a superfície bicúbica de Bézier usando o algoritmo de De Casteljau."""
@@ -433,209 +1104,24 @@ class BezierSurface3D(Object3D):
             ]
         return points[0]
 
-    def draw(self, canvas, clip_region):
-        # Desenha a superfície como uma malha de linhas ou polígonos
-        steps = len(self.surface_points) - 1
-        for i in range(steps):
-            for j in range(steps):
-                p0 = self.surface_points[i][j]
-                p1 = self.surface_points[i][j + 1]
-                p2 = self.surface_points[i + 1][j + 1]
-                p3 = self.surface_points[i + 1][j]
-                # Verifica se os pontos estão visíveis
-                if None not in (p0, p1, p2, p3):
-                    if self.wireframe:
-                        # Desenha as arestas do quadrilátero
-                        lines = [
-                            (p0, p1),
-                            (p1, p2),
-                            (p2, p3),
-                            (p3, p0),
-                        ]
-                        for line in lines:
-                            x0, y0 = line[0]
-                            x1, y1 = line[1]
-                            clipped_line = cohen_sutherland_clip(x0, y0, x1, y1, clip_region)
-                            if clipped_line:
-                                x0_clipped, y0_clipped, x1_clipped, y1_clipped = clipped_line
-                                canvas.create_line(x0_clipped, y0_clipped, x1_clipped, y1_clipped, fill=self.color)
-                    else:
-                        # Desenha o quadrilátero preenchido
-                        polygon = [p0, p1, p2, p3]
-                        clipped_polygon = sutherland_hodgman_clip(polygon, clip_region)
-                        if clipped_polygon:
-                            flat_points = [coord for point in clipped_polygon for coord in point]
-                            canvas.create_polygon(flat_points, fill=self.color, outline='black')
-
-class BSplineSurface3D(Object3D):
-    """Class to represent a bicubic B-spline surface in 3D using forward differences."""
+class BSplineSurface3D(Surface3D):
+    """Class to represent a bicubic B-spline surface in 3D."""
     def __init__(self, control_points_matrix, color='yellow', wireframe=True, name=""):
-        super().__init__(name)
-        self.control_points = control_points_matrix  # Matrix of control points (list of lists of Point3D)
-        self.color = color
-        self.wireframe = wireframe
-        self.surface_points = []  # Evaluated surface points
-        self.steps = 10  # Number of divisions in u and v directions
-
-    def transform(self, view_matrix):
-        for row in self.control_points:
-            for point in row:
-                point.transform(view_matrix)
-
-    def is_visible(self):
-        """Check if any part of the surface is visible."""
-        return any(point.tz < 0 for row in self.control_points for point in row)
+        super().__init__(control_points_matrix, color, wireframe, name)
 
     def project(self, project_func):
-        """Evaluate the surface using forward differences and project the points."""
-        self.surface_points = []
-        self.project_func = project_func  # Store the projection function for use in other methods
-
-        # Use forward differences to compute surface points
-        n = len(self.control_points)
-        m = len(self.control_points[0])
+        """Evaluate the whole sample grid of all patches at once and project it."""
+        net = self.control_net()
+        n, m = net.shape[:2]
         if n < 4 or m < 4:
             # Need at least 4x4 control points
+            self.surface_points = np.empty((0, 0, 2))
+            self.surface_visible = np.empty((0, 0), dtype=bool)
             return
 
-        # Basis matrix for B-spline
-        M_bspline = (1/6) * np.array([
-            [-1,  3, -3,  1],
-            [ 3, -6,  3,  0],
-            [-3,  0,  3,  0],
-            [ 1,  4,  1,  0]
-        ])
-
-        # Iterate over patches
-        for i in range(n - 3):
-            for j in range(m - 3):
-                # Extract 4x4 control points for the current patch
-                Gx = np.array([[self.control_points[i + a][j + b].tx for b in range(4)] for a in range(4)])
-                Gy = np.array([[self.control_points[i + a][j + b].ty for b in range(4)] for a in range(4)])
-                Gz = np.array([[self.control_points[i + a][j + b].tz for b in range(4)] for a in range(4)])
-
-                # Compute the coefficients matrices
-                Coeff_x = M_bspline @ Gx @ M_bspline.T
-                Coeff_y = M_bspline @ Gy @ M_bspline.T
-                Coeff_z = M_bspline @ Gz @ M_bspline.T
-
-                # Evaluate the patch using forward differences
-                patch_points = self.evaluate_patch_forward_differences(Coeff_x, Coeff_y, Coeff_z)
-                self.surface_points.extend(patch_points)
-
-    def evaluate_patch_forward_differences(self, Coeff_x, Coeff_y, Coeff_z):
-        """Evaluate a single patch using forward differences."""
-        steps = self.steps
-        du = 1 / steps
-        dv = 1 / steps
-
-        # Initialize arrays to hold points
-        patch_points = []
-
-        # Compute initial values and deltas for u and v
-        u = 0
-        for s in range(steps + 1):
-            v = 0
-            # Initialize De Boor's algorithm for the u-direction
-            U = np.array([u**3, u**2, u, 1])
-            delta_U = np.array([3*u**2, 2*u, 1, 0]) * du
-            delta2_U = np.array([6*u, 2, 0, 0]) * du**2
-            delta3_U = np.array([6, 0, 0, 0]) * du**3
-
-            # Evaluate the initial point in v-direction
-            V = np.array([v**3, v**2, v, 1])
-            delta_V = np.array([3*v**2, 2*v, 1, 0]) * dv
-            delta2_V = np.array([6*v, 2, 0, 0]) * dv**2
-            delta3_V = np.array([6, 0, 0, 0]) * dv**3
-
-            # Compute initial point
-            x = U @ Coeff_x @ V
-            y = U @ Coeff_y @ V
-            z = U @ Coeff_z @ V
-
-            # Store the point if visible
-            if z < 0:
-                screen_x, screen_y = self.project_func(x, y, z)
-                patch_points.append((screen_x, screen_y))
-            else:
-                patch_points.append(None)
-
-            # Precompute deltas for v-direction
-            delta_x_v = U @ Coeff_x @ delta_V
-            delta_y_v = U @ Coeff_y @ delta_V
-            delta_z_v = U @ Coeff_z @ delta_V
-
-            delta2_x_v = U @ Coeff_x @ delta2_V
-            delta2_y_v = U @ Coeff_y @ delta2_V
-            delta2_z_v = U @ Coeff_z @ delta2_V
-
-            delta3_x_v = U @ Coeff_x @ delta3_V
-            delta3_y_v = U @ Coeff_y @ delta3_V
-            delta3_z_v = U @ Coeff_z @ delta3_V
-
-            # Iterate over v
-            for t in range(steps):
-                # Update x, y, z in v-direction using forward differences
-                delta_x_v += delta2_x_v
-                delta_y_v += delta2_y_v
-                delta_z_v += delta2_z_v
-
-                delta2_x_v += delta3_x_v
-                delta2_y_v += delta3_y_v
-                delta2_z_v += delta3_z_v
-
-                x += delta_x_v
-                y += delta_y_v
-                z += delta_z_v
-
-                if z < 0:
-                    screen_x, screen_y = self.project_func(x, y, z)
-                    patch_points.append((screen_x, screen_y))
-                else:
-                    patch_points.append(None)
-                v += dv
-            u += du
-        return patch_points
-
-    def draw(self, canvas, clip_region):
-        """Draw the surface."""
-        steps_u = self.steps
-        steps_v = self.steps
-
-        num_patches_u = len(self.control_points) - 3
-        num_patches_v = len(self.control_points[0]) - 3
-
-        total_steps_u = steps_u * num_patches_u
-        total_steps_v = steps_v * num_patches_v
-
-        for i in range(total_steps_u):
-            for j in range(total_steps_v):
-                idx = i * (total_steps_v + 1) + j
-                p0 = self.surface_points[idx]
-                p1 = self.surface_points[idx + 1]
-                p2 = self.surface_points[idx + total_steps_v + 2]
-                p3 = self.surface_points[idx + total_steps_v + 1]
-
-                if None not in (p0, p1, p2, p3):
-                    if self.wireframe:
-                        # Draw lines
-                        lines = [
-                            (p0, p1),
-                            (p1, p2),
-                            (p2, p3),
-                            (p3, p0)
-                        ]
-                        for line in lines:
-                            x0, y0 = line[0]
-                            x1, y1 = line[1]
-                            clipped_line = cohen_sutherland_clip(x0, y0, x1, y1, clip_region)
-                            if clipped_line:
-                                x0_clipped, y0_clipped, x1_clipped, y1_clipped = clipped_line
-                                canvas.create_line(x0_clipped, y0_clipped, x1_clipped, y1_clipped, fill=self.color)
-                    else:
-                        # Draw filled polygon
-                        polygon = [p0, p1, p2, p3]
-                        clipped_polygon = sutherland_hodgman_clip(polygon, clip_region)
-                        if clipped_polygon:
-                            flat_points = [coord for point in clipped_polygon for coord in point]
-                            canvas.create_polygon(flat_points, fill=self.color, outline='black')
\ No newline at end of file
+        # Cached piecewise basis for each direction; seam samples appear only once
+        steps_u, steps_v = self.lod_steps(net, project_func, patches=(n - 3, m - 3))
+        basis_u = bspline_patch_basis(n, steps_u)
+        basis_v = bspline_patch_basis(m, steps_v)
+        grid = np.stack([basis_u @ net[:, :, c] @ basis_v.T for c in range(3)], axis=-1)
+        self.project_grid(grid, project_func)
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 from object3d import *
 
@@ -14,122 +15,103 @@ class Transformation:
             dx, dy, dz = self.params
             return f"Translação: dx={dx}, dy={dy}, dz={dz}"
         elif self.type == 'rotate':
-            angle, axis = self.params
+            angle, axis = self.params[:2]
+            if len(self.params) > 2:
+                return f"Rotação: ângulo={angle}, eixo={axis}, pivô={self.params[2]}"
             return f"Rotação: ângulo={angle}, eixo={axis}"
         elif self.type == 'scale':
-            sx, sy, sz = self.params
+            sx, sy, sz = self.params[:3]
             return f"Escala: sx={sx}, sy={sy}, sz={sz}"
         else:
             return "Transformação desconhecida"
 
+    def matrix(self):
+        """Matriz homogênea 4x4 da transformação."""
+        if self.type == 'translate':
+            return translation_matrix(*self.params)
+        elif self.type == 'rotate':
+            return rotation_matrix(*self.params)
+        elif self.type == 'scale':
+            return scaling_matrix(*self.params)
+        else:
+            return np.identity(4)
+
+
+def translation_matrix(dx, dy, dz):
+    """Matriz homogênea de translação."""
+    matrix = np.identity(4)
+    matrix[:3, 3] = (dx, dy, dz)
+    return matrix
+
+def scaling_matrix(sx, sy, sz, pivot=None):
+    """Matriz homogênea de escala, em relação à origem ou a um ponto fixo (pivot)."""
+    matrix = np.diag([sx, sy, sz, 1.0])
+    return about_pivot(matrix, pivot)
+
+def rotation_matrix(angle, axis, pivot=None):
+    """Matriz homogênea de rotação de `angle` graus.
+
+    axis: 'x', 'y', 'z' ou um vetor (x, y, z) qualquer, usado como eixo de rotação
+    pivot: ponto pelo qual o eixo passa (por padrão, a origem)
+    """
+    if isinstance(axis, str):
+        axes = {'x': (1, 0, 0), 'y': (0, 1, 0), 'z': (0, 0, 1)}
+        if axis.lower() not in axes:
+            raise ValueError("Axis must be 'x', 'y', or 'z'")
+        axis = axes[axis.lower()]
+    axis = np.asarray(axis, dtype=float)
+    length = np.linalg.norm(axis)
+    if length == 0:
+        raise ValueError("Axis must be a non-zero vector")
+    x, y, z = axis / length
+    angle_rad = math.radians(angle)
+    cos_a = math.cos(angle_rad)
+    sin_a = math.sin(angle_rad)
+    # Fórmula de Rodrigues: R = cos I + sin [k]x + (1 - cos) k kᵀ
+    cross = np.array([[0, -z, y], [z, 0, -x], [-y, x, 0]])
+    matrix = np.identity(4)
+    matrix[:3, :3] = cos_a * np.identity(3) + sin_a * cross + (1 - cos_a) * np.outer((x, y, z), (x, y, z))
+    return about_pivot(matrix, pivot)
+
+def about_pivot(matrix, pivot):
+    """Conjuga a matriz com translações para que ela atue em torno do ponto pivot."""
+    if pivot is None:
+        return matrix
+    px, py, pz = pivot
+    return translation_matrix(px, py, pz) @ matrix @ translation_matrix(-px, -py, -pz)
+
+def compose_transformations(transformations):
+    """Compõe uma sequência de transformações (aplicadas em ordem) em uma única matriz."""
+    matrix = np.identity(4)
+    for transformation in transformations:
+        matrix = transformation.matrix() @ matrix
+    return matrix
+
+def apply_matrix(obj, matrix):
+    """Acumula uma matriz homogênea na matriz de modelo do objeto.
+
+    Os vértices não são alterados: a matriz de modelo é combinada com a matriz de
+    visualização uma vez por quadro, então o custo não depende do tamanho do objeto.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    model = np.identity(4) if obj.model_matrix is None else obj.model_matrix
+    obj.model_matrix = matrix @ model
+    obj.invalidate_bounds()
+
 
 def translate_object(obj, dx, dy, dz):
-    """Translada um objeto modificando suas coordenadas diretamente."""
-    if isinstance(obj, Point3D):
-        obj.x += dx
-        obj.y += dy
-        obj.z += dz
-    elif isinstance(obj, Line3D):
-        translate_object(obj.start, dx, dy, dz)
-        translate_object(obj.end, dx, dy, dz)
-    elif isinstance(obj, Polygon3D):
-        for vertex in obj.vertices:
-            translate_object(vertex, dx, dy, dz)
-    elif isinstance(obj, BezierCurve3D) or isinstance(obj, BSplineCurve3D):
-        for point in obj.control_points:
-            translate_object(point, dx, dy, dz)
-    elif isinstance(obj, Cone3D):
-        translate_object(obj.apex, dx, dy, dz)
-        translate_object(obj.base_center, dx, dy, dz)
-        for vertex in obj.base_vertices:
-            translate_object(vertex, dx, dy, dz)
-    elif isinstance(obj, Cube3D):
-        for vertex in obj.vertices:
-            translate_object(vertex, dx, dy, dz)
-    elif isinstance(obj, BezierSurface3D):
-        for row in obj.control_points:
-            for point in row:
-                translate_object(point, dx, dy, dz)
-    else:
-        pass  # Para outros tipos de objetos
+    """Translada um objeto pela sua matriz de modelo."""
+    apply_matrix(obj, translation_matrix(dx, dy, dz))
 
 def scale_object(obj, sx, sy, sz):
-    """Escalona um objeto modificando suas coordenadas diretamente."""
-    if isinstance(obj, Point3D):
-        obj.x *= sx
-        obj.y *= sy
-        obj.z *= sz
-    elif isinstance(obj, Line3D):
-        scale_object(obj.start, sx, sy, sz)
-        scale_object(obj.end, sx, sy, sz)
-    elif isinstance(obj, Polygon3D):
-        for vertex in obj.vertices:
-            scale_object(vertex, sx, sy, sz)
-    elif isinstance(obj, BezierCurve3D) or isinstance(obj, BSplineCurve3D):
-        for point in obj.control_points:
-            scale_object(point, sx, sy, sz)
-    elif isinstance(obj, Cone3D):
-        scale_object(obj.apex, sx, sy, sz)
-        scale_object(obj.base_center, sx, sy, sz)
-        for vertex in obj.base_vertices:
-            scale_object(vertex, sx, sy, sz)
+    """Escalona um objeto pela sua matriz de modelo."""
+    apply_matrix(obj, scaling_matrix(sx, sy, sz))
+    if isinstance(obj, Cone3D):
         obj.height *= sy  # Ajusta a altura
         obj.radius *= sx  # Ajusta o raio (assumindo escalonamento uniforme em x e z)
     elif isinstance(obj, Cube3D):
-        for vertex in obj.vertices:
-            scale_object(vertex, sx, sy, sz)
         obj.size *= max(sx, sy, sz)  # Ajusta o tamanho (assumindo escalonamento uniforme)
-    elif isinstance(obj, BezierSurface3D):
-        for row in obj.control_points:
-            for point in row:
-                scale_object(point, sx, sy, sz)
-    else:
-        pass  # Para outros tipos de objetos
-
-def rotate_object(obj, angle, axis):
-    """Rotaciona um objeto modificando suas coordenadas diretamente."""
-    angle_rad = math.radians(angle)
-    if axis.lower() == 'x':
-        cos_a = math.cos(angle_rad)
-        sin_a = math.sin(angle_rad)
-        rotation_func = lambda x, y, z: (x, y * cos_a - z * sin_a, y * sin_a + z * cos_a)
-    elif axis.lower() == 'y':
-        cos_a = math.cos(angle_rad)
-        sin_a = math.sin(angle_rad)
-        rotation_func = lambda x, y, z: (x * cos_a + z * sin_a, y, -x * sin_a + z * cos_a)
-    elif axis.lower() == 'z':
-        cos_a = math.cos(angle_rad)
-        sin_a = math.sin(angle_rad)
-        rotation_func = lambda x, y, z: (x * cos_a - y * sin_a, x * sin_a + y * cos_a, z)
-    else:
-        raise ValueError("Axis must be 'x', 'y', or 'z'")
-
-    def rotate_point(p):
-        x, y, z = p.x, p.y, p.z
-        p.x, p.y, p.z = rotation_func(x, y, z)
-
-    if isinstance(obj, Point3D):
-        rotate_point(obj)
-    elif isinstance(obj, Line3D):
-        rotate_object(obj.start, angle, axis)
-        rotate_object(obj.end, angle, axis)
-    elif isinstance(obj, Polygon3D):
-        for vertex in obj.vertices:
-            rotate_object(vertex, angle, axis)
-    elif isinstance(obj, BezierCurve3D) or isinstance(obj, BSplineCurve3D):
-        for point in obj.control_points:
-            rotate_object(point, angle, axis)
-    elif isinstance(obj, Cone3D):
-        rotate_object(obj.apex, angle, axis)
-        rotate_object(obj.base_center, angle, axis)
-        for vertex in obj.base_vertices:
-            rotate_object(vertex, angle, axis)
-    elif isinstance(obj, Cube3D):
-        for vertex in obj.vertices:
-            rotate_object(vertex, angle, axis)
-    elif isinstance(obj, BezierSurface3D):
-        for row in obj.control_points:
-            for point in row:
-                rotate_object(point, angle, axis)
-    else:
-        pass  # Para outros tipos de objetos
+
+def rotate_object(obj, angle, axis, pivot=None):
+    """Rotaciona um objeto pela sua matriz de modelo."""
+    apply_matrix(obj, rotation_matrix(angle, axis, pivot))
@@ -0,0 +1,62 @@
+import numpy as np
+
+
+class VertexBuffer:
+    """Armazena os vértices de toda a cena em um único array contíguo (N, 4).
+
+    Cada objeto registrado ocupa um intervalo de linhas do buffer, de modo que a
+    transformação de visualização de todos os vértices vira uma única
+    multiplicação de matrizes por quadro.
+    """
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.size = 0  # Número de linhas ocupadas
+        # Coordenadas originais em coordenadas homogêneas (w = 1)
+        self.vertices = np.zeros((capacity, 4))
+        self.vertices[:, 3] = 1.0
+        # Coordenadas transformadas pela matriz de visualização
+        self.transformed = np.zeros((capacity, 4))
+
+    def allocate(self, count):
+        """Reserva `count` linhas consecutivas e retorna o índice da primeira."""
+        start = self.size
+        if start + count > self.capacity:
+            self.grow(start + count)
+        self.size += count
+        return start
+
+    def grow(self, min_capacity):
+        """Realoca os arrays, no mínimo dobrando a capacidade."""
+        capacity = max(min_capacity, 2 * self.capacity)
+        vertices = np.zeros((capacity, 4))
+        vertices[:, 3] = 1.0
+        vertices[:self.size] = self.vertices[:self.size]
+        transformed = np.zeros((capacity, 4))
+        transformed[:self.size] = self.transformed[:self.size]
+        self.vertices = vertices
+        self.transformed = transformed
+        self.capacity = capacity
+
+    def transform(self, view_matrix, ranges=None):
+        """Aplica a matriz de visualização aos vértices de uma só vez.
+
+        ranges: intervalos (início, fim) a transformar; por padrão, todo o buffer
+        """
+        n = self.size
+        matrix = np.asarray(view_matrix, dtype=float)
+        if ranges is not None:
+            ranges = np.asarray(ranges, dtype=np.int64).reshape(-1, 2)
+            counts = ranges[:, 1] - ranges[:, 0]
+            total = int(counts.sum())
+            # Com boa parte do buffer nos intervalos, a multiplicação completa sai mais barata
+            if total < n // 2:
+                rows = np.repeat(ranges[:, 0] - np.cumsum(counts) + counts, counts) + np.arange(total)
+                self.transformed[rows] = self.vertices[rows] @ matrix.T
+                return
+        np.matmul(self.vertices[:n], matrix.T, out=self.transformed[:n])
+
+    def transform_range(self, matrix, vertex_range):
+        """Aplica uma matriz apenas às linhas do intervalo (início, fim)."""
+        start, end = vertex_range
+        matrix = np.asarray(matrix, dtype=float)
+        np.matmul(self.vertices[start:end], matrix.T, out=self.transformed[start:end])